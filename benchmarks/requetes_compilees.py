@@ -0,0 +1,55 @@
+"""Compare le coût de préparation de la requête de recherche de communes
+
+Mesure, pour chaque requête, le temps moyen passé à construire et compiler le
+SQL de la recherche de communes, d'une part par l'ORM, d'autre part avec le
+cache de :py:class:`data_france.requetes_compilees.RecherchesCompilees`. Le script
+n'accède pas à la base de données :
+
+    DJANGO_SETTINGS_MODULE=monprojet.settings python benchmarks/requetes_compilees.py
+"""
+import argparse
+import timeit
+
+import django
+
+django.setup()
+
+from django.db import connection
+
+from data_france.views import recherches_communes, requete_recherche_communes
+
+TOUS_TYPES = ("COM", "ARM", "COMA", "COMD", "SRM")
+
+CAS = [
+    ("sa", TOUS_TYPES, False, False, 11),
+    ("saint etienne", TOUS_TYPES, False, False, 11),
+    ("saint etienne", ("COM",), False, False, 21),
+    ("chateauneuf du pape", TOUS_TYPES, False, True, 11),
+]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("-n", "--nombre", type=int, default=2000)
+    args = parser.parse_args()
+
+    print(f"{'requête':<24} {'approchée':<10} {'ORM (µs)':>10} {'cache (µs)':>11}")
+    for q, *forme in CAS:
+        orm = timeit.timeit(
+            lambda: requete_recherche_communes(q, *forme)
+            .query.get_compiler(connection=connection)
+            .as_sql(),
+            number=args.nombre,
+        )
+        cache = timeit.timeit(
+            lambda: recherches_communes.sql(q, *forme), number=args.nombre
+        )
+
+        print(
+            f"{q:<24} {'oui' if forme[2] else 'non':<10} "
+            f"{orm / args.nombre * 1e6:>10.1f} {cache / args.nombre * 1e6:>11.1f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
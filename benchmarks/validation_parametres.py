@@ -0,0 +1,57 @@
+"""Compare le coût de validation des paramètres par formulaire et par parseur
+
+Mesure le temps moyen de validation des paramètres des vues de recherche et
+d'affichage par code avec un formulaire Django et avec
+:py:class:`data_france.forms.ParseurParametres`. Le script n'accède pas à la
+base de données :
+
+    DJANGO_SETTINGS_MODULE=monprojet.settings python benchmarks/validation_parametres.py
+"""
+import argparse
+import timeit
+
+import django
+
+django.setup()
+
+from django.http import QueryDict
+
+from data_france.forms import (
+    CommuneParametresForm,
+    CommuneParCodeParametresForm,
+    ParCodeParametresForm,
+    parseur,
+)
+
+CAS = [
+    (CommuneParametresForm, "q=saint&limit=5"),
+    (CommuneParametresForm, "q=saint&type=COM&type=ARM&geojson=1"),
+    (CommuneParCodeParametresForm, "code=59350&type=COM"),
+    (ParCodeParametresForm, "code=200093201"),
+    (ParCodeParametresForm, "code="),
+]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("-n", "--nombre", type=int, default=20000)
+    args = parser.parse_args()
+
+    print(f"{'formulaire':<30} {'requête':<38} {'form (µs)':>10} {'parseur (µs)':>13}")
+    for form_class, requete in CAS:
+        data = QueryDict(requete)
+        p = parseur(form_class)
+
+        form = timeit.timeit(
+            lambda: form_class(data=data).is_valid(), number=args.nombre
+        )
+        rapide = timeit.timeit(lambda: p.valider(data), number=args.nombre)
+
+        print(
+            f"{form_class.__name__:<30} {requete:<38} "
+            f"{form / args.nombre * 1e6:>10.1f} {rapide / args.nombre * 1e6:>13.1f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
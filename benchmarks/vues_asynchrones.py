@@ -0,0 +1,70 @@
+"""Compare le débit des vues synchrones et asynchrones sous ASGI
+
+Les vues synchrones sont exécutées comme le fait le gestionnaire ASGI de Django
+(`sync_to_async(thread_sensitive=True)`), les vues asynchrones via
+:py:func:`data_france.asynchrone.vue_asynchrone`.
+
+Le script doit être lancé avec un projet Django configuré, dont la base contient
+les données importées :
+
+    DJANGO_SETTINGS_MODULE=monprojet.settings python benchmarks/vues_asynchrones.py
+"""
+import argparse
+import asyncio
+import time
+
+import django
+
+django.setup()
+
+from asgiref.sync import sync_to_async
+from django.test import RequestFactory
+
+from data_france.asynchrone import vue_asynchrone
+from data_france.views import RechercheCommuneView, CommuneParCodeView
+
+REQUETES = [
+    (RechercheCommuneView, "/communes/chercher/", {"q": "saint"}),
+    (RechercheCommuneView, "/communes/chercher/", {"q": "ville"}),
+    (CommuneParCodeView, "/communes/par-code/", {"code": "75056", "type": "COM"}),
+]
+
+
+async def mesurer(vues, nombre, concurrence):
+    factory = RequestFactory()
+    semaphore = asyncio.Semaphore(concurrence)
+
+    async def appeler(i):
+        vue, url, params = vues[i % len(vues)]
+        async with semaphore:
+            res = await vue(factory.get(url, params))
+        assert res.status_code == 200, res.content
+
+    debut = time.perf_counter()
+    await asyncio.gather(*(appeler(i) for i in range(nombre)))
+    return nombre / (time.perf_counter() - debut)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("-n", "--nombre", type=int, default=1000)
+    parser.add_argument("-c", "--concurrence", type=int, nargs="+", default=[1, 10, 50])
+    args = parser.parse_args()
+
+    vues_sync = [
+        (sync_to_async(c.as_view(), thread_sensitive=True), url, params)
+        for c, url, params in REQUETES
+    ]
+    vues_async = [
+        (vue_asynchrone(c.as_view()), url, params) for c, url, params in REQUETES
+    ]
+
+    print(f"{'concurrence':>12} {'sync (req/s)':>14} {'async (req/s)':>14}")
+    for concurrence in args.concurrence:
+        sync = asyncio.run(mesurer(vues_sync, args.nombre, concurrence))
+        async_ = asyncio.run(mesurer(vues_async, args.nombre, concurrence))
+        print(f"{concurrence:>12} {sync:>14.1f} {async_:>14.1f}")
+
+
+if __name__ == "__main__":
+    main()
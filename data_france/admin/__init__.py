@@ -2,7 +2,7 @@ from django.contrib import admin
 from django.urls import reverse
 from django.utils.html import format_html, format_html_join, mark_safe
 
-from data_france.admin.utils import list_of_links, ImmutableModelAdmin
+from data_france.admin.utils import list_of_links, ImmutableModelAdmin, RechercheMixin
 from data_france.models import (
     Commune,
     EPCI,
@@ -24,7 +24,7 @@ from data_france.typologies import Fonction
 
 
 @admin.register(Commune)
-class CommuneAdmin(ImmutableModelAdmin):
+class CommuneAdmin(RechercheMixin, ImmutableModelAdmin):
     fieldsets = (
         (None, {"fields": ("code", "nom_complet", "geometry_as_widget")}),
         (
@@ -71,12 +71,6 @@ class CommuneAdmin(ImmutableModelAdmin):
             return qs.select_related("departement", "commune_parent", "epci")
         return qs
 
-    def get_search_results(self, request, queryset, search_term):
-        use_distinct = False
-        if search_term:
-            return queryset.search(search_term), use_distinct
-        return queryset, use_distinct
-
     def nom_complet(self, obj):
         return obj.nom_complet
 
@@ -111,7 +105,7 @@ class CommuneAdmin(ImmutableModelAdmin):
 
 
 @admin.register(EPCI)
-class EPCIAdmin(ImmutableModelAdmin):
+class EPCIAdmin(RechercheMixin, ImmutableModelAdmin):
     fieldsets = (
         (
             None,
@@ -175,7 +169,7 @@ class EPCIAdmin(ImmutableModelAdmin):
 
 
 @admin.register(Departement)
-class DepartementAdmin(ImmutableModelAdmin):
+class DepartementAdmin(RechercheMixin, ImmutableModelAdmin):
     list_display = ("code", "nom", "region_link", "chef_lieu_link")
     fields = list_display + (
         "population",
@@ -243,7 +237,7 @@ class CollectiviteDepartementaleAdmin(ImmutableModelAdmin):
 
 
 @admin.register(Region)
-class RegionAdmin(ImmutableModelAdmin):
+class RegionAdmin(RechercheMixin, ImmutableModelAdmin):
     list_display = ("code", "nom", "chef_lieu_link")
     fields = list_display + (
         "departements_list",
@@ -292,8 +286,9 @@ class CodePostalAdmin(ImmutableModelAdmin):
 
 
 @admin.register(Canton)
-class CantonAdmin(ImmutableModelAdmin):
+class CantonAdmin(RechercheMixin, ImmutableModelAdmin):
     list_display = ("code", "nom_complet", "departement", "type")
+    search_fields = ("code", "nom")
 
     fieldsets = (
         (
@@ -314,7 +309,7 @@ class CantonAdmin(ImmutableModelAdmin):
 
 
 @admin.register(CirconscriptionConsulaire)
-class CirconscriptionConsulaire(ImmutableModelAdmin):
+class CirconscriptionConsulaire(RechercheMixin, ImmutableModelAdmin):
     list_display = (
         "nom",
         "consulats",
@@ -325,12 +320,6 @@ class CirconscriptionConsulaire(ImmutableModelAdmin):
 
     search_fields = ("nom", "consulats")
 
-    def get_search_results(self, request, queryset, search_term):
-        use_distinct = False
-        if search_term:
-            return queryset.search(search_term), use_distinct
-        return queryset, use_distinct
-
 
 @admin.register(CirconscriptionLegislative)
 class CirconscriptionLegislativeAdmin(ImmutableModelAdmin):
@@ -367,7 +356,7 @@ class RNEAdmin(ImmutableModelAdmin):
 
 
 @admin.register(EluMunicipal)
-class EluMunicipalAdmin(RNEAdmin):
+class EluMunicipalAdmin(RechercheMixin, RNEAdmin):
     search_fields = ("nom", "prenom")
 
     list_display = ("nom_complet", "commune", "sexe", "libelle_fonction")
@@ -422,17 +411,11 @@ class EluMunicipalAdmin(RNEAdmin):
 
     def get_queryset(self, request):
         qs = super(EluMunicipalAdmin, self).get_queryset(request)
-        return qs.select_related("commune")
-
-    def get_search_results(self, request, queryset, search_term):
-        use_distinct = False
-        if search_term:
-            return queryset.search(search_term), use_distinct
-        return queryset, use_distinct
+        return qs.select_related("commune").sans_champs_lourds()
 
 
 @admin.register(EluDepartemental)
-class EluDepartemental(RNEAdmin):
+class EluDepartemental(RechercheMixin, RNEAdmin):
     search_fields = ("nom", "prenom")
 
     list_display = ("nom_complet", "canton", "libelle_fonction")
@@ -456,7 +439,7 @@ class EluDepartemental(RNEAdmin):
 
 
 @admin.register(EluRegional)
-class EluRegional(RNEAdmin):
+class EluRegional(RechercheMixin, RNEAdmin):
     search_fields = ("nom", "prenom")
 
     list_display = ("nom_complet", "region", "libelle_fonction")
@@ -480,7 +463,7 @@ class EluRegional(RNEAdmin):
 
 
 @admin.register(Depute)
-class DeputeAdmin(RNEAdmin):
+class DeputeAdmin(RechercheMixin, RNEAdmin):
     search_fields = ("nom", "prenom")
     list_display = ("nom_complet", "circonscription", "sexe", "groupe", "relation")
 
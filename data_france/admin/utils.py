@@ -136,3 +136,18 @@ class ImmutableModelAdmin(AddRelatedLinkMixin, ReadOnlyGeometryMixin, OSMGeoAdmi
 
     def has_change_permission(self, request, obj=None):
         return False
+
+
+class RechercheMixin(ModelAdmin):
+    """Recherche dans l'admin à l'aide du vecteur de recherche du modèle
+
+    Remplace les recherches `ILIKE` sur `search_fields`, qui parcourent toute la
+    table, par :py:meth:`~data_france.models.SearchQueryset.search`, qui utilise
+    l'index GIN du champ `search`.
+    """
+
+    def get_search_results(self, request, queryset, search_term):
+        use_distinct = False
+        if search_term:
+            return queryset.search(search_term), use_distinct
+        return queryset, use_distinct
@@ -0,0 +1,48 @@
+"""Versions asynchrones des vues de data_france, pour un déploiement ASGI
+
+Sous ASGI, Django 3.1 exécute toutes les vues synchrones dans un unique fil
+d'exécution partagé (`thread_sensitive=True`) : les requêtes de recherche et de
+consultation par code sont alors traitées une par une, quel que soit le nombre
+de clients simultanés.
+
+L'ORM de Django 3.1 n'offre pas d'API asynchrone : les vues de ce module
+exécutent donc les vues synchrones existantes dans le pool de threads de
+l'event loop (`thread_sensitive=False`), ce qui permet de traiter plusieurs
+requêtes en parallèle sans bloquer la boucle d'événements. Chaque thread
+utilisant sa propre connexion à la base, les connexions sont fermées selon les
+règles habituelles (`CONN_MAX_AGE`) à l'issue de chaque requête.
+"""
+from functools import wraps
+
+from asgiref.sync import sync_to_async
+from django.db import close_old_connections
+
+
+def _executer(vue, request, *args, **kwargs):
+    close_old_connections()
+    try:
+        return vue(request, *args, **kwargs)
+    finally:
+        close_old_connections()
+
+
+def vue_asynchrone(vue):
+    """Renvoie une version asynchrone d'une vue synchrone
+
+    Les attributs de la vue (`view_class`, `csrf_exempt`, etc.) sont conservés.
+
+    Les vues qui renvoient une :py:class:`~django.http.StreamingHttpResponse`
+    alimentée par l'ORM (les exports) ne doivent pas être converties : Django 3.1
+    itère le contenu de ces réponses dans la boucle d'événements, où l'accès à la
+    base est interdit.
+
+    :param vue: une vue Django synchrone, par exemple le résultat de `as_view()`
+    :return: une vue coroutine
+    """
+    executer = sync_to_async(_executer, thread_sensitive=False)
+
+    @wraps(vue)
+    async def vue_async(request, *args, **kwargs):
+        return await executer(vue, request, *args, **kwargs)
+
+    return vue_async
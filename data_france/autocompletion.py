@@ -0,0 +1,438 @@
+"""Moteur d'autocomplétion des communes en mémoire
+
+Pour la recherche de communes, qui est le chemin le plus sollicité, les communes
+peuvent être indexées dans la mémoire de chaque processus, ce qui évite une
+requête plein texte à chaque frappe. Le moteur est activé par le réglage
+`DATA_FRANCE_AUTOCOMPLETION`, construit depuis la base à la première recherche,
+et reconstruit à chaque changement de version des données.
+
+Le moteur reproduit exactement :py:meth:`CommuneQueryset.search` :
+
+* les termes formés d'un unique nombre sont cherchés comme début de code INSEE ou
+  de code postal (voir :py:func:`data_france.search.prefixe_code`) ;
+* les autres sont comparés aux lexèmes des vecteurs de recherche de la base,
+  après la même analyse que `to_tsquery` avec la configuration
+  `data_france_search` : normalisation (voir
+  :py:func:`data_france.search.normaliser_texte`), suppression des mots vides et
+  racinisation par l'algorithme Snowball français, qui nécessite la dépendance
+  optionnelle `snowballstemmer` (extra `autocompletion`) ;
+* les résultats sont ordonnés par le rang statique `rang_recherche` pour les
+  préfixes courts et les débuts de code, et sinon par le même calcul que
+  `ts_rank` (avec la normalisation 8, en simple précision), pondéré par la
+  popularité des communes.
+"""
+import math
+from array import array
+from bisect import bisect_left, bisect_right
+from functools import lru_cache
+from heapq import nsmallest
+from struct import Struct
+from threading import Lock
+
+from django.conf import settings
+from django.db import connections, router
+from django.db.models import Prefetch
+
+from data_france.cache import version_donnees
+from data_france.models import Commune, CodePostal, poids_popularite
+from data_france.search import normaliser_texte, prefixe_code
+
+try:
+    import snowballstemmer
+except ImportError:
+    snowballstemmer = None
+
+# mots vides du dictionnaire `french_stem` de PostgreSQL ; ceux qui comportent des
+# accents, absents des termes normalisés, sont omis
+MOTS_VIDES = frozenset(
+    """
+    au aux avec ce ces dans de des du elle en et eux il je la le leur lui ma mais me
+    mes moi mon ne nos notre nous on ou par pas pour qu que qui sa se ses son sur ta
+    te tes toi ton tu un une vos votre vous c d j l m n s t y suis es est sommes
+    sont serai seras sera serons serez seront serais serait serions seriez seraient
+    fus fut furent sois soit soyons soyez soient fusse fusses fussions fussiez
+    fussent ayant ayante ayantes ayants eu eue eues eus ai as avons avez ont aurai
+    auras aura aurons aurez auront aurais aurait aurions auriez auraient avais
+    avait avions aviez avaient eut eurent aie aies ait ayons ayez aient eusse
+    eusses eussions eussiez eussent
+    """.split()
+)
+
+# au-delà de tous les caractères des lexèmes
+_FIN_PREFIXE = "\uffff"
+
+# les positions des lexèmes sont codées comme par PostgreSQL (`WordEntryPos`) :
+# le poids (0 pour D à 3 pour A) sur les deux bits de poids fort, la position
+# sur les 14 autres
+_BITS_POSITION = 14
+_MASQUE_POSITION = (1 << _BITS_POSITION) - 1
+_POIDS_LETTRES = {"D": 0, "C": 1, "B": 2, "A": 3}
+# positions substituées à celles des lexèmes qui n'en ont pas (codes postaux)
+_SANS_POSITION_OU = (0,)
+_SANS_POSITION_ET = (_MASQUE_POSITION,)
+
+_moteur = None
+_verrou = Lock()
+
+_racinisation = None
+_verrou_racinisation = Lock()
+
+_flottant = Struct("f")
+
+
+def _simple_precision(nombre):
+    """Arrondit un nombre à la simple précision (`float4`) des calculs de `ts_rank`"""
+    return _flottant.unpack(_flottant.pack(nombre))[0]
+
+
+# poids par défaut de ts_rank pour les catégories D, C, B et A
+_POIDS = [_simple_precision(p) for p in (0.1, 0.2, 0.4, 1.0)]
+# pondération de la distance entre deux lexèmes (`word_distance`)
+_PONDERATIONS_DISTANCE = [None] + [
+    _simple_precision(1.0 / (1.005 + 0.05 * math.exp(d / 1.5 - 2)))
+    for d in range(1, 101)
+]
+_PONDERATION_DISTANCE_MAX = _simple_precision(1e-30)
+
+
+def _ponderation_distance(distance):
+    if distance > 100:
+        return _PONDERATION_DISTANCE_MAX
+    return _PONDERATIONS_DISTANCE[distance]
+
+
+def _rang_ou(positions_par_element):
+    """Reproduit `calc_rank_or` de PostgreSQL (requêtes d'un seul élément)"""
+    rang = 0.0
+    for positions_entrees in positions_par_element:
+        for positions in positions_entrees:
+            somme, poids_max, j_max = 0.0, -1.0, 0
+            for j, position in enumerate(positions or _SANS_POSITION_OU):
+                poids = _POIDS[position >> _BITS_POSITION]
+                somme = _simple_precision(
+                    somme + _simple_precision(poids / ((j + 1) * (j + 1)))
+                )
+                if poids > poids_max:
+                    poids_max, j_max = poids, j
+            terme = _simple_precision(
+                _simple_precision(poids_max + somme)
+                - _simple_precision(poids_max / ((j_max + 1) * (j_max + 1)))
+            )
+            rang = _simple_precision(rang + terme / 1.64493406685)
+    return _simple_precision(rang / len(positions_par_element))
+
+
+def _rang_paire(position, autre, distance):
+    """Renvoie la contribution d'une paire de positions au rang de `calc_rank_and`"""
+    produit = _simple_precision(
+        _POIDS[position >> _BITS_POSITION] * _POIDS[autre >> _BITS_POSITION]
+    )
+    return _simple_precision(
+        math.sqrt(_simple_precision(produit * _ponderation_distance(distance)))
+    )
+
+
+def _rang_et(positions_par_element):
+    """Reproduit `calc_rank_and` de PostgreSQL (requêtes de plusieurs éléments)"""
+    rang = -1.0
+    dernieres = [None] * len(positions_par_element)
+    for i, positions_entrees in enumerate(positions_par_element):
+        for positions in positions_entrees:
+            dernieres[i] = positions = positions or _SANS_POSITION_ET
+            for autres in dernieres[:i]:
+                if autres is None:
+                    continue
+                sans_position = (
+                    positions is _SANS_POSITION_ET or autres is _SANS_POSITION_ET
+                )
+                for p in positions:
+                    for a in autres:
+                        distance = abs((p & _MASQUE_POSITION) - (a & _MASQUE_POSITION))
+                        if not distance:
+                            if not sans_position:
+                                continue
+                            distance = _MASQUE_POSITION + 1
+                        courant = _rang_paire(p, a, distance)
+                        if rang < 0:
+                            rang = courant
+                        else:
+                            rang = _simple_precision(
+                                1.0 - (1.0 - rang) * (1.0 - courant)
+                            )
+    return rang
+
+
+def ts_rank(positions_par_element, nombre_lexemes):
+    """Calcule le rang `ts_rank` d'un vecteur de recherche, avec la normalisation 8
+
+    Le calcul est celui de PostgreSQL, y compris l'arrondi en simple précision de
+    chaque étape : les rangs sont identiques à ceux calculés par la base.
+
+    :param positions_par_element: pour chaque élément distinct de la requête, dans
+      l'ordre des lexèmes recherchés, la liste des positions codées (ou `None`)
+      de chaque lexème correspondant du vecteur, dans l'ordre des lexèmes
+    :param nombre_lexemes: le nombre de lexèmes du vecteur
+    :return: le rang, en simple précision
+    """
+    if len(positions_par_element) < 2:
+        rang = _rang_ou(positions_par_element)
+    else:
+        rang = _rang_et(positions_par_element)
+    if rang < 0:
+        rang = _simple_precision(1e-20)
+    return _simple_precision(rang / nombre_lexemes)
+
+
+@lru_cache(maxsize=4096)
+def _lexeme(mot):
+    """Renvoie le lexème produit par `to_tsquery` pour un mot normalisé, ou `None`
+
+    Comme dans la configuration `data_france_search`, seuls les mots formés de
+    lettres sont racinisés, et les mots vides sont supprimés.
+    """
+    global _racinisation
+
+    if not mot.isalpha():
+        return mot
+    if mot in MOTS_VIDES:
+        return None
+
+    with _verrou_racinisation:
+        if _racinisation is None:
+            _racinisation = snowballstemmer.stemmer("french")
+        return _racinisation.stemWord(mot)
+
+
+def elements_requete(termes):
+    """Renvoie les éléments de la requête plein texte correspondant aux termes
+
+    :param termes: les termes recherchés
+    :return: la liste des couples (lexème, préfixe) où `préfixe` indique si le
+      lexème est cherché comme préfixe (seul le dernier mot l'est)
+    """
+    mots = normaliser_texte(termes).split()
+    elements = []
+    for n, mot in enumerate(mots):
+        lexeme = _lexeme(mot)
+        if lexeme is not None:
+            elements.append((lexeme, n == len(mots) - 1))
+    return elements
+
+
+class Autocompletion:
+    """Index en mémoire des communes
+
+    Les lexèmes des vecteurs de recherche de toutes les communes sont gardés dans
+    un tableau trié, ce qui permet de retrouver par dichotomie toutes les communes
+    dont un lexème est égal à un autre, ou commence par un préfixe donné. Les codes
+    INSEE et postaux le sont de la même façon.
+
+    :param communes: une liste de triplets (commune, codes postaux, lexèmes), les
+      lexèmes étant les triplets (lexème, positions, poids) du vecteur de
+      recherche de la commune (voir :py:meth:`depuis_base`)
+    :param version: l'identifiant de la version des données indexées
+    """
+
+    def __init__(self, communes, version=None):
+        self.version = version
+
+        self._ids = []
+        self._types = []
+        self._documents = []
+        self._rangs = array("d")
+        # facteur de popularité appliqué au rang plein texte de chaque commune
+        self._facteurs = array("d")
+        self._nombres_lexemes = array("I")
+        poids_pop = poids_popularite()
+
+        entrees = []
+        codes = []
+        for i, (commune, codes_postaux, lexemes) in enumerate(communes):
+            self._ids.append(commune.id)
+            self._types.append(commune.type)
+            self._documents.append(commune.as_dict())
+            self._rangs.append(commune.rang_recherche)
+            self._facteurs.append(1 + poids_pop * commune.popularite)
+            self._nombres_lexemes.append(len(lexemes))
+
+            for lexeme, positions, poids in lexemes:
+                if positions is not None:
+                    positions = tuple(
+                        _POIDS_LETTRES[p] << _BITS_POSITION | position
+                        for position, p in zip(positions, poids)
+                    )
+                entrees.append((lexeme, i, positions))
+
+            codes.extend((code, i) for code in {commune.code, *codes_postaux})
+
+        entrees.sort(key=lambda e: e[:2])
+        self._lexemes = [e[0] for e in entrees]
+        self._communes = array("I", (e[1] for e in entrees))
+        self._positions = [e[2] for e in entrees]
+
+        codes.sort()
+        self._codes = [c[0] for c in codes]
+        self._communes_codes = array("I", (c[1] for c in codes))
+
+    @classmethod
+    def depuis_base(cls, using=None):
+        """Construit l'index à partir des communes enregistrées dans la base
+
+        :param using: l'alias de la base de données
+        """
+        using = using or router.db_for_read(Commune)
+        version = version_donnees()
+
+        lexemes = {}
+        with connections[using].cursor() as cursor:
+            cursor.execute(
+                """
+                SELECT c.id, u.lexeme, u.positions, u.weights
+                FROM data_france_commune AS c, unnest(c.search) AS u;
+                """
+            )
+            for id_commune, lexeme, positions, poids in cursor:
+                lexemes.setdefault(id_commune, []).append((lexeme, positions, poids))
+
+        communes = (
+            Commune.objects.using(using)
+            .select_related("departement", "commune_parent__departement")
+            .sans_champs_lourds()
+            .prefetch_related(
+                Prefetch("codes_postaux", queryset=CodePostal.objects.only("code"))
+            )
+        )
+        return cls(
+            [
+                (c, [cp.code for cp in c.codes_postaux.all()], lexemes.get(c.id, []))
+                for c in communes
+            ],
+            version=version and version.id,
+        )
+
+    def _intervalle(self, valeurs, valeur, prefixe):
+        debut = bisect_left(valeurs, valeur)
+        fin = bisect_right(valeurs, valeur + _FIN_PREFIXE if prefixe else valeur)
+        return range(debut, fin)
+
+    def _correspondances(self, lexeme, prefixe):
+        """Renvoie, pour chaque commune, les indices de ses lexèmes correspondants"""
+        correspondances = {}
+        for k in self._intervalle(self._lexemes, lexeme, prefixe):
+            correspondances.setdefault(self._communes[k], []).append(k)
+        return correspondances
+
+    def scores(self, termes):
+        """Renvoie le score de chaque commune correspondant aux termes
+
+        Les communes et leurs scores sont ceux que renvoie
+        :py:meth:`CommuneQueryset.search` (dans l'annotation `rank`).
+
+        :param termes: les termes recherchés
+        :return: un dictionnaire associant à l'indice de chaque commune son score
+        """
+        prefixe = prefixe_code(termes)
+        if prefixe is not None:
+            return {
+                self._communes_codes[k]: self._rangs[self._communes_codes[k]]
+                for k in self._intervalle(self._codes, prefixe, prefixe=True)
+            }
+
+        elements = elements_requete(termes)
+        if not elements:
+            return {}
+
+        # comme ts_rank, le rang ne tient compte que des éléments distincts (le
+        # dernier doublon est conservé), pris dans l'ordre de leurs lexèmes
+        distincts = dict(elements)
+        correspondances = {}
+        communes = None
+        for lexeme, prefixe in elements:
+            par_commune = correspondances.setdefault(
+                (lexeme, prefixe), self._correspondances(lexeme, prefixe)
+            )
+            communes = (
+                set(par_commune) if communes is None else communes & par_commune.keys()
+            )
+            if not communes:
+                return {}
+
+        if Commune.objects.none()._prefixe_court(termes):
+            return {i: self._rangs[i] for i in communes}
+
+        par_element = [
+            correspondances[lexeme, prefixe]
+            for lexeme, prefixe in sorted(distincts.items())
+        ]
+        return {
+            i: ts_rank(
+                [[self._positions[k] for k in c[i]] for c in par_element],
+                self._nombres_lexemes[i],
+            )
+            * self._facteurs[i]
+            for i in communes
+        }
+
+    def chercher(self, termes, types=None, limite=10, apres=None):
+        """Renvoie une page de communes correspondant aux termes recherchés
+
+        Les résultats sont ordonnés par score décroissant puis par identifiant.
+
+        :param termes: les termes recherchés
+        :param types: les types de communes à renvoyer (tous par défaut)
+        :param limite: le nombre maximal de résultats
+        :param apres: la clé (score, identifiant) du dernier résultat de la page
+          précédente
+        :raises ValueError: si la clé `apres` est invalide
+        :return: un couple (liste des communes sérialisées, clé du dernier résultat
+          si d'autres résultats suivent, ou `None`)
+        """
+        if apres is not None:
+            try:
+                score_apres, id_apres = apres
+                cle_apres = (-float(score_apres), int(id_apres))
+            except TypeError:
+                raise ValueError("Clé de pagination invalide.")
+
+        candidats = (
+            (-score, self._ids[i], i)
+            for i, score in self.scores(termes).items()
+            if types is None or self._types[i] in types
+        )
+        if apres is not None:
+            candidats = (c for c in candidats if c[:2] > cle_apres)
+
+        page = nsmallest(limite + 1, candidats)
+        resultats = [self._documents[i] for _, _, i in page[:limite]]
+
+        if len(page) > limite:
+            score, id_commune, _ = page[limite - 1]
+            return resultats, [-score, id_commune]
+        return resultats, None
+
+
+def autocompletion():
+    """Renvoie le moteur d'autocomplétion des communes, s'il est activé
+
+    Le moteur est construit au premier appel, puis reconstruit lorsque la version
+    des données change.
+
+    :return: l'instance de :py:class:`Autocompletion` partagée, ou `None` si le
+      réglage `DATA_FRANCE_AUTOCOMPLETION` n'est pas activé ou si le paquet
+      `snowballstemmer` n'est pas installé
+    """
+    global _moteur
+
+    if not getattr(settings, "DATA_FRANCE_AUTOCOMPLETION", False):
+        return None
+    if snowballstemmer is None:
+        return None
+
+    version = version_donnees()
+    version = version and version.id
+    if _moteur is None or _moteur.version != version:
+        with _verrou:
+            if _moteur is None or _moteur.version != version:
+                _moteur = Autocompletion.depuis_base()
+
+    return _moteur
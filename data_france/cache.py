@@ -0,0 +1,175 @@
+"""Cache HTTP des vues, indexé sur la version des données chargées
+
+Les données de référence ne changent qu'à l'exécution de
+:py:func:`data_france.data.importer_donnees` : chaque import est enregistré
+comme une :py:class:`~data_france.models.VersionDonnees`, dont on dérive l'ETag
+et l'en-tête `Last-Modified` des réponses.
+"""
+from collections import OrderedDict
+from threading import Lock
+from time import monotonic
+
+from django.conf import settings
+from django.utils.cache import patch_cache_control
+from django.views.decorators.http import condition
+
+from data_france.formats import format_reponse
+from data_france.models import VersionDonnees
+
+# durée de vie par défaut des réponses dans les caches HTTP (1 semaine)
+DEFAULT_MAX_AGE = 7 * 24 * 3600
+
+# durée pendant laquelle la version des données est gardée en mémoire avant
+# d'être relue dans la base
+DEFAULT_VERSION_TTL = 60
+
+_version = None
+_version_expiration = None
+_cache_par_code = None
+
+
+def version_donnees():
+    """Renvoie la version des données actuellement chargées
+
+    La version est gardée en mémoire pendant `DATA_FRANCE_VERSION_TTL` secondes
+    pour éviter une requête à chaque appel.
+
+    :return: la dernière :py:class:`VersionDonnees`, ou `None` si les données
+      n'ont jamais été importées.
+    """
+    global _version, _version_expiration
+
+    maintenant = monotonic()
+    if _version_expiration is None or maintenant >= _version_expiration:
+        _version = VersionDonnees.objects.order_by("-date", "-id").first()
+        _version_expiration = maintenant + getattr(
+            settings, "DATA_FRANCE_VERSION_TTL", DEFAULT_VERSION_TTL
+        )
+
+    return _version
+
+
+def reinitialiser_version():
+    """Force la relecture de la version des données au prochain appel"""
+    global _version_expiration
+    _version_expiration = None
+
+
+def etag_version(request, *args, **kwargs):
+    version = version_donnees()
+    if version is None:
+        return None
+    # chaque format de réponse est une représentation distincte
+    return f"{version.id}-{int(version.date.timestamp())}-{format_reponse(request)}"
+
+
+def last_modified_version(request, *args, **kwargs):
+    version = version_donnees()
+    if version is None:
+        return None
+    return version.date
+
+
+class VersionCacheMixin:
+    """Mixin de vue ajoutant les en-têtes de cache HTTP
+
+    Les réponses portent un ETag fort et un en-tête `Last-Modified` dérivés de la
+    version des données, et les requêtes conditionnelles (`If-None-Match`,
+    `If-Modified-Since`) reçoivent une réponse 304 sans exécuter la vue.
+    """
+
+    def dispatch(self, request, *args, **kwargs):
+        response = condition(
+            etag_func=etag_version, last_modified_func=last_modified_version
+        )(super().dispatch)(request, *args, **kwargs)
+
+        if response.status_code in (200, 304) and version_donnees() is not None:
+            patch_cache_control(
+                response,
+                public=True,
+                max_age=getattr(settings, "DATA_FRANCE_CACHE_MAX_AGE", DEFAULT_MAX_AGE),
+            )
+
+        return response
+
+
+class LRUCache:
+    """Cache en mémoire de taille bornée, avec éviction des entrées les moins récentes
+
+    Le cache est vidé automatiquement lorsque la version des données change.
+
+    :param taille: le nombre maximal d'entrées conservées
+    """
+
+    def __init__(self, taille):
+        self.taille = taille
+        self.hits = 0
+        self.misses = 0
+        self._entrees = OrderedDict()
+        self._version = None
+        self._lock = Lock()
+
+    def _verifier_version(self):
+        version = version_donnees()
+        version = version and version.id
+        if version != self._version:
+            self._entrees.clear()
+            self._version = version
+
+    def get(self, cle):
+        with self._lock:
+            self._verifier_version()
+            try:
+                valeur = self._entrees[cle]
+            except KeyError:
+                self.misses += 1
+                return None
+            self._entrees.move_to_end(cle)
+            self.hits += 1
+            return valeur
+
+    def set(self, cle, valeur):
+        with self._lock:
+            self._verifier_version()
+            self._entrees[cle] = valeur
+            self._entrees.move_to_end(cle)
+            while len(self._entrees) > self.taille:
+                self._entrees.popitem(last=False)
+
+    def vider(self):
+        with self._lock:
+            self._entrees.clear()
+            self.hits = self.misses = 0
+
+    def infos(self):
+        """Renvoie les statistiques d'utilisation du cache
+
+        :return: un dictionnaire avec le nombre de hits, de misses, la taille
+          maximale et la taille actuelle du cache
+        """
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "taille": self.taille,
+            "entrees": len(self._entrees),
+        }
+
+
+def cache_par_code():
+    """Renvoie le cache des réponses des vues par code
+
+    Ce cache n'est activé que si le réglage `DATA_FRANCE_PAR_CODE_CACHE_SIZE`
+    est strictement positif.
+
+    :return: l'instance de :py:class:`LRUCache` partagée, ou `None`
+    """
+    global _cache_par_code
+
+    taille = getattr(settings, "DATA_FRANCE_PAR_CODE_CACHE_SIZE", 0)
+    if not taille:
+        return None
+
+    if _cache_par_code is None or _cache_par_code.taille != taille:
+        _cache_par_code = LRUCache(taille)
+
+    return _cache_par_code
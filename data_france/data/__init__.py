@@ -9,7 +9,7 @@ from typing import Tuple
 
 from django.db import transaction
 from django.db.transaction import get_connection
-from psycopg2.sql import SQL, Identifier
+from psycopg2.sql import SQL, Identifier, Literal
 
 from data_france.utils import TypeNom
 
@@ -40,6 +40,11 @@ COPY_FROM_TEMP_TABLE = SQL(
 )
 
 
+# facteur appliqué à la popularité des entités qui ne sont pas des communes à part
+# entière, pour qu'elles soient classées après leur commune de rattachement
+FACTEURS_POPULARITE = {"ARM": 0.5, "SRM": 0.5, "COMD": 0.25, "COMA": 0.25}
+
+
 @dataclass
 class SecteurPLM:
     code: str
@@ -596,6 +601,8 @@ def creer_collectivites_regionales(using):
 
 @console_message("Mise à jour de l'index de recherche")
 def creer_index_recherche(using):
+    from data_france.models import poids_popularite
+
     with get_connection(using).cursor() as cursor:
         cursor.execute(
             """
@@ -630,11 +637,11 @@ def creer_index_recherche(using):
 
             UPDATE data_france_commune AS dfc
             SET search =
-                setweight(to_tsvector('data_france_search' :: regconfig, dfc.nom), 'A') ||
-                setweight(to_tsvector('data_france_search' :: regconfig, dfc.code), 'C') ||
+                setweight(data_france_vecteur_recherche(dfc.nom), 'A') ||
+                setweight(data_france_vecteur_recherche(dfc.code), 'C') ||
                 setweight(COALESCE(cps.codes_postaux, '' :: tsvector), 'B') ||
                 setweight(to_tsvector(deps.code), 'C') ||
-                setweight(to_tsvector('data_france_search', deps.nom), 'D')
+                setweight(data_france_vecteur_recherche(deps.nom), 'D')
             FROM cps, deps
             WHERE dfc.id = cps.commune_id
             AND dfc.id = deps.commune_id;
@@ -666,25 +673,145 @@ def creer_index_recherche(using):
 
             UPDATE data_france_elumunicipal em
             SET search =
-                   setweight(to_tsvector('data_france_search', COALESCE(em."nom", '')), 'A')
-                || setweight(to_tsvector('data_france_search', COALESCE(em."prenom", '')), 'A')
-                || setweight(to_tsvector('data_france_search', COALESCE(c."nom", '')), 'B')
+                   setweight(data_france_vecteur_recherche(COALESCE(em."nom", '')), 'A')
+                || setweight(data_france_vecteur_recherche(COALESCE(em."prenom", '')), 'A')
+                || setweight(data_france_vecteur_recherche(COALESCE(c."nom", '')), 'B')
                 || setweight(COALESCE(cps.codes_postaux, '' :: tsvector), 'C')
                 || setweight(to_tsvector(deps.code), 'C')
-                || setweight(to_tsvector('data_france_search', deps.nom), 'D')
+                || setweight(data_france_vecteur_recherche(deps.nom), 'D')
             FROM data_france_commune c, cps, deps
             WHERE c.id = em.commune_id AND c.id = cps.commune_id AND c.id = deps.commune_id;"""
         )
 
+        # popularité des communes, entre 0 et 1 : logarithme de la population,
+        # minorée pour les entités qui ne sont pas des communes à part entière
+        cursor.execute(
+            SQL(
+                """
+            UPDATE data_france_commune
+            SET popularite = CASE type {facteurs} ELSE 1 END
+              * ln(1 + COALESCE(population_municipale, 0))
+              / (SELECT ln(2 + MAX(population_municipale)) FROM data_france_commune);
+            """
+            ).format(
+                facteurs=SQL(" ").join(
+                    SQL("WHEN {} THEN {}").format(Literal(t), Literal(f))
+                    for t, f in FACTEURS_POPULARITE.items()
+                )
+            )
+        )
+
+        # rang statique utilisé pour ordonner les recherches par préfixe court :
+        # celui qu'aurait, avec la normalisation 8 de ts_rank, une correspondance
+        # sur un unique lexème de poids A (pondéré par la popularité des communes)
+        cursor.execute(
+            """
+            UPDATE data_france_commune
+            SET rang_recherche = (1.0 + %s * popularite) / GREATEST(length(search), 1);
+
+            UPDATE data_france_elumunicipal
+            SET rang_recherche = 1.0 / GREATEST(length(search), 1);
+            """,
+            (poids_popularite(),),
+        )
+
         cursor.execute(
             """
         UPDATE data_france_circonscriptionconsulaire c
         SET search =
-            setweight(to_tsvector('data_france_search', COALESCE(c.nom, '')), 'A')
-         || setweight(to_tsvector('data_france_search', ARRAY_TO_STRING(c.consulats, ' ')), 'B');
+            setweight(data_france_vecteur_recherche(COALESCE(c.nom, '')), 'A')
+         || setweight(data_france_vecteur_recherche(ARRAY_TO_STRING(c.consulats, ' ')), 'B');
 """
         )
 
+        cursor.execute(
+            """
+        UPDATE data_france_epci e
+        SET search =
+            setweight(data_france_vecteur_recherche(e.nom), 'A')
+         || setweight(data_france_vecteur_recherche(e.code), 'C');
+
+        UPDATE data_france_departement d
+        SET search =
+            setweight(data_france_vecteur_recherche(d.nom), 'A')
+         || setweight(data_france_vecteur_recherche(d.code), 'C');
+
+        UPDATE data_france_region r
+        SET search =
+            setweight(data_france_vecteur_recherche(r.nom), 'A')
+         || setweight(data_france_vecteur_recherche(r.code), 'C');
+
+        UPDATE data_france_canton c
+        SET search =
+            setweight(data_france_vecteur_recherche(c.nom), 'A')
+         || setweight(data_france_vecteur_recherche(c.code), 'C')
+         || setweight(data_france_vecteur_recherche(d.code), 'C')
+         || setweight(data_france_vecteur_recherche(d.nom), 'D')
+        FROM data_france_departement d
+        WHERE d.id = c.departement_id;
+
+        UPDATE data_france_depute dep
+        SET search =
+            setweight(data_france_vecteur_recherche(COALESCE(dep.nom, '')), 'A')
+         || setweight(data_france_vecteur_recherche(COALESCE(dep.prenom, '')), 'A')
+         || setweight(data_france_vecteur_recherche(circo.code), 'C')
+         || setweight(data_france_vecteur_recherche(COALESCE(circo.nom_departement, '')), 'D')
+        FROM (
+            SELECT c.id, c.code, d.nom AS nom_departement
+            FROM data_france_circonscriptionlegislative c
+            LEFT JOIN data_france_departement d ON d.id = c.departement_id
+        ) AS circo
+        WHERE circo.id = dep.circonscription_id;
+
+        UPDATE data_france_eludepartemental ed
+        SET search =
+            setweight(data_france_vecteur_recherche(COALESCE(ed.nom, '')), 'A')
+         || setweight(data_france_vecteur_recherche(COALESCE(ed.prenom, '')), 'A')
+         || setweight(data_france_vecteur_recherche(c.nom), 'B')
+         || setweight(data_france_vecteur_recherche(d.code), 'C')
+         || setweight(data_france_vecteur_recherche(d.nom), 'D')
+        FROM data_france_canton c, data_france_departement d
+        WHERE c.id = ed.canton_id AND d.id = c.departement_id;
+
+        UPDATE data_france_eluregional er
+        SET search =
+            setweight(data_france_vecteur_recherche(COALESCE(er.nom, '')), 'A')
+         || setweight(data_france_vecteur_recherche(COALESCE(er.prenom, '')), 'A')
+         || setweight(data_france_vecteur_recherche(r.nom), 'B')
+        FROM data_france_region r
+        WHERE r.id = er.region_id;
+"""
+        )
+
+
+@console_message("Précalcul des listes")
+def precalculer_listes(using):
+    from data_france.documents import precalculer_listes
+
+    precalculer_listes(using)
+
+
+@console_message("Précalcul des documents des entités")
+def precalculer_entites(using):
+    from data_france.documents import precalculer_entites
+
+    precalculer_entites(using)
+
+
+@console_message("Enregistrement de la version des données")
+def enregistrer_version(using):
+    from data_france.cache import reinitialiser_version
+
+    with get_connection(using).cursor() as cursor:
+        cursor.execute(
+            """
+            INSERT INTO "data_france_versiondonnees" ("date")
+            VALUES (CURRENT_TIMESTAMP);
+            """
+        )
+
+    reinitialiser_version()
+
 
 def import_with_temp_table(csv_file, table, using):
     temp_table = f"{table}_temp"
@@ -763,6 +890,12 @@ def importer_donnees(using=None):
 
         creer_index_recherche(using)
 
+        precalculer_listes(using)
+
+        precalculer_entites(using)
+
+        enregistrer_version(using)
+
     finally:
         if not auto_commit:
             transaction.set_autocommit(False, using=using)
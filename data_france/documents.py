@@ -0,0 +1,226 @@
+"""Documents JSON précalculés lors de l'import des données
+
+Les listes complètes de certaines entités (départements, régions, etc.), ainsi
+que la représentation de chaque entité renvoyée par les vues par code, sont
+sérialisées une fois pour toutes par :py:func:`data_france.data.importer_donnees`
+et enregistrées dans la table des :py:class:`~data_france.models.DocumentPrecalcule`.
+Les vues renvoient ces documents tels quels ; les listes sont de plus gardées en
+mémoire par chaque processus jusqu'au prochain changement de version des données.
+"""
+import json
+
+from django.contrib.gis.db.models import GeometryField
+from django.db.models import Func, Prefetch
+
+from data_france.cache import LRUCache
+from data_france.formats import GeoJSONEncoder
+from data_france.models import (
+    Commune,
+    EPCI,
+    Departement,
+    Region,
+    CodePostal,
+    CollectiviteDepartementale,
+    CollectiviteRegionale,
+    DocumentPrecalcule,
+)
+
+# tolérance de simplification des géométries des listes, en degrés (~500 m)
+TOLERANCE_SIMPLIFICATION = 0.005
+
+_documents = LRUCache(32)
+
+
+class Simplifier(Func):
+    """Simplifie une géométrie en préservant sa topologie"""
+
+    function = "ST_SimplifyPreserveTopology"
+    template = "%(function)s(%(expressions)s::geometry, %(tolerance)s)"
+
+    def __init__(self, expression, tolerance):
+        super().__init__(
+            expression, tolerance=tolerance, output_field=GeometryField(srid=4326)
+        )
+
+
+class Liste:
+    """Liste complète d'entités servie par une vue de liste
+
+    :param queryset: les entités de la liste, dans leur ordre d'affichage
+    :param geometrie: le chemin vers la géométrie des entités
+    """
+
+    def __init__(self, queryset, geometrie="geometry"):
+        self.queryset = queryset
+        self.geometrie = geometrie
+
+    def document(self, geometrie=False, using=None):
+        """Renvoie la liste sérialisée en JSON
+
+        :param geometrie: s'il faut renvoyer une FeatureCollection avec les
+          géométries simplifiées des entités
+        :param using: l'alias de la base de données
+        """
+        qs = self.queryset.using(using).sans_champs_lourds()
+
+        if not geometrie:
+            return json.dumps(
+                {"results": [e.as_dict() for e in qs]}, cls=GeoJSONEncoder
+            )
+
+        qs = qs.annotate(
+            geometrie_simplifiee=Simplifier(self.geometrie, TOLERANCE_SIMPLIFICATION)
+        )
+        return json.dumps(
+            {
+                "type": "FeatureCollection",
+                "features": [
+                    {
+                        "type": "Feature",
+                        "properties": e.as_dict(),
+                        "geometry": e.geometrie_simplifiee,
+                    }
+                    for e in qs
+                ],
+            },
+            cls=GeoJSONEncoder,
+        )
+
+
+LISTES = {
+    "departements": Liste(Departement.objects.select_related("chef_lieu")),
+    "regions": Liste(Region.objects.select_related("chef_lieu")),
+    "collectivites-departementales": Liste(CollectiviteDepartementale.objects.all()),
+    "collectivites-regionales": Liste(
+        CollectiviteRegionale.objects.all(), geometrie="region__geometry"
+    ),
+    "epci": Liste(
+        EPCI.objects.prefetch_related(
+            Prefetch(
+                "communes", queryset=Commune.objects.only("epci_id", "code", "nom")
+            )
+        )
+    ),
+}
+
+
+class Entites:
+    """Entités dont la représentation individuelle est précalculée
+
+    :param queryset: les entités, avec les relations nécessaires à `as_dict()`
+    :param champs_cle: les champs identifiant une entité dans les vues par code
+    """
+
+    def __init__(self, queryset, champs_cle=("code",)):
+        self.queryset = queryset
+        self.champs_cle = champs_cle
+
+    def documents(self, nom, using=None):
+        """Génère les documents de toutes les entités
+
+        :param nom: le nom des entités (une clé de :py:data:`ENTITES`)
+        :param using: l'alias de la base de données
+        """
+        for e in self.queryset.using(using).sans_champs_lourds():
+            yield DocumentPrecalcule(
+                cle=cle_entite(nom, {c: getattr(e, c) for c in self.champs_cle}),
+                contenu=json.dumps(e.as_dict(), cls=GeoJSONEncoder),
+            )
+
+
+ENTITES = {
+    "communes": Entites(
+        Commune.objects.select_related("departement", "commune_parent__departement"),
+        champs_cle=("code", "type"),
+    ),
+    "epci": Entites(LISTES["epci"].queryset),
+    "departements": Entites(Departement.objects.select_related("chef_lieu")),
+    "regions": Entites(Region.objects.select_related("chef_lieu")),
+    "codes-postaux": Entites(
+        CodePostal.objects.prefetch_related(
+            Prefetch(
+                "communes", queryset=Commune.objects.only("code", "nom", "type_nom")
+            )
+        )
+    ),
+    "collectivites-departementales": Entites(CollectiviteDepartementale.objects.all()),
+    "collectivites-regionales": Entites(CollectiviteRegionale.objects.all()),
+}
+
+
+def cle_liste(nom, geometrie=False):
+    return f"listes/{nom}{'.geojson' if geometrie else ''}"
+
+
+def precalculer_listes(using=None):
+    """Calcule et enregistre les documents de toutes les listes
+
+    :param using: l'alias de la base de données
+    """
+    documents = [
+        DocumentPrecalcule(
+            cle=cle_liste(nom, geometrie),
+            contenu=liste.document(geometrie=geometrie, using=using),
+        )
+        for nom, liste in LISTES.items()
+        for geometrie in (False, True)
+    ]
+
+    DocumentPrecalcule.objects.using(using).filter(cle__startswith="listes/").delete()
+    DocumentPrecalcule.objects.using(using).bulk_create(documents)
+
+
+def cle_entite(nom, valeurs):
+    return "/".join(["entites", nom, *(str(valeurs[c]) for c in sorted(valeurs))])
+
+
+def precalculer_entites(using=None):
+    """Calcule et enregistre les documents de toutes les entités
+
+    :param using: l'alias de la base de données
+    """
+    DocumentPrecalcule.objects.using(using).filter(cle__startswith="entites/").delete()
+    for nom, entites in ENTITES.items():
+        DocumentPrecalcule.objects.using(using).bulk_create(
+            entites.documents(nom, using=using), batch_size=2000
+        )
+
+
+def document_entite(nom, valeurs):
+    """Renvoie le document JSON d'une entité
+
+    :param nom: le nom des entités (une clé de :py:data:`ENTITES`)
+    :param valeurs: les valeurs des champs identifiant l'entité
+    :return: le document JSON, ou `None` s'il n'existe pas
+    """
+    return (
+        DocumentPrecalcule.objects.filter(cle=cle_entite(nom, valeurs))
+        .values_list("contenu", flat=True)
+        .first()
+    )
+
+
+def document_liste(nom, geometrie=False):
+    """Renvoie le document JSON d'une liste
+
+    Si le document n'a pas été précalculé (données importées avec une version
+    antérieure de data_france), il est calculé à la volée.
+
+    :param nom: le nom de la liste (une clé de :py:data:`LISTES`)
+    :param geometrie: s'il faut la version avec géométries
+    :return: le document JSON, sous forme de chaîne
+    """
+    cle = cle_liste(nom, geometrie)
+
+    contenu = _documents.get(cle)
+    if contenu is None:
+        contenu = (
+            DocumentPrecalcule.objects.filter(cle=cle)
+            .values_list("contenu", flat=True)
+            .first()
+        )
+        if contenu is None:
+            contenu = LISTES[nom].document(geometrie=geometrie)
+        _documents.set(cle, contenu)
+
+    return contenu
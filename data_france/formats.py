@@ -0,0 +1,126 @@
+"""Formats de réponse des vues : JSON, et msgpack pour les clients à fort volume
+
+Le format est choisi par négociation de contenu, selon l'en-tête `Accept` de la
+requête. Le format msgpack nécessite la dépendance optionnelle `msgpack` (extra
+`msgpack`) ; s'il n'est pas installé, les réponses sont toujours en JSON.
+"""
+import datetime
+import json
+
+from django.contrib.gis.geos import GEOSGeometry
+from django.core.serializers.json import DjangoJSONEncoder
+from django.http import HttpResponse, JsonResponse
+from django.utils.cache import patch_vary_headers
+
+try:
+    import msgpack
+except ImportError:
+    msgpack = None
+
+FORMAT_JSON = "json"
+FORMAT_MSGPACK = "msgpack"
+
+TYPES_MSGPACK = ("application/msgpack", "application/x-msgpack")
+TYPES_JSON = ("application/json", "application/*", "*/*")
+
+
+def _qualites(accept):
+    """Renvoie la qualité (paramètre `q`) de chaque type de média d'un en-tête `Accept`"""
+    qualites = {}
+    for intervalle in accept.split(","):
+        type_media, *parametres = (p.strip() for p in intervalle.split(";"))
+        if not type_media:
+            continue
+        qualite = 1.0
+        for parametre in parametres:
+            nom, _, valeur = parametre.partition("=")
+            if nom.strip().lower() == "q":
+                try:
+                    qualite = float(valeur)
+                except ValueError:
+                    qualite = 0.0
+        type_media = type_media.lower()
+        qualites[type_media] = max(qualite, qualites.get(type_media, 0.0))
+    return qualites
+
+
+def format_reponse(request):
+    """Renvoie le format de réponse demandé par le client
+
+    msgpack n'est choisi que si l'en-tête `Accept` lui donne une qualité non
+    nulle, au moins égale à celle de JSON (y compris via `application/*` ou
+    `*/*`).
+
+    :param request: la requête HTTP
+    :return: :py:data:`FORMAT_MSGPACK` si le client préfère msgpack et que
+      celui-ci est disponible, :py:data:`FORMAT_JSON` sinon
+    """
+    if msgpack is None:
+        return FORMAT_JSON
+
+    qualites = _qualites(request.META.get("HTTP_ACCEPT", ""))
+    qualite_msgpack = max(qualites.get(t, 0.0) for t in TYPES_MSGPACK)
+    qualite_json = max(qualites.get(t, 0.0) for t in TYPES_JSON)
+    if qualite_msgpack > 0 and qualite_msgpack >= qualite_json:
+        return FORMAT_MSGPACK
+    return FORMAT_JSON
+
+
+class GeoJSONEncoder(DjangoJSONEncoder):
+    """Encodeur JSON qui sérialise les géométries au format GeoJSON"""
+
+    def default(self, o):
+        if isinstance(o, GEOSGeometry):
+            return json.loads(o.geojson)
+        return super().default(o)
+
+
+def _msgpack_default(o, *, wkb):
+    if isinstance(o, GEOSGeometry):
+        return bytes(o.wkb) if wkb else json.loads(o.geojson)
+    if isinstance(o, (datetime.date, datetime.time)):
+        return o.isoformat()
+    raise TypeError(f"Type non sérialisable en msgpack : {type(o)!r}")
+
+
+def repondre(request, donnees, status=200):
+    """Sérialise les données dans le format demandé par le client
+
+    Les géométries présentes dans les données sont sérialisées au format GeoJSON,
+    ou, en msgpack, directement au format WKB si le paramètre GET `wkb` est
+    présent avec une valeur non vide.
+
+    :param request: la requête HTTP
+    :param donnees: le dictionnaire à sérialiser
+    :param status: le code HTTP de la réponse
+    :return: la réponse HTTP
+    """
+    if format_reponse(request) == FORMAT_MSGPACK:
+        contenu = msgpack.packb(
+            donnees,
+            default=lambda o: _msgpack_default(o, wkb=bool(request.GET.get("wkb"))),
+        )
+        response = HttpResponse(contenu, content_type=TYPES_MSGPACK[0], status=status)
+    else:
+        response = JsonResponse(donnees, encoder=GeoJSONEncoder, status=status)
+
+    patch_vary_headers(response, ["Accept"])
+    return response
+
+
+def repondre_document(request, contenu):
+    """Renvoie un document déjà sérialisé en JSON
+
+    Le document est renvoyé tel quel en JSON, et n'est désérialisé que si le
+    client demande du msgpack.
+
+    :param request: la requête HTTP
+    :param contenu: le document JSON, sous forme de chaîne ou d'octets
+    :return: la réponse HTTP
+    """
+    if format_reponse(request) == FORMAT_MSGPACK:
+        return repondre(request, json.loads(contenu))
+
+    response = HttpResponse(contenu, content_type="application/json")
+    patch_vary_headers(response, ["Accept"])
+    return response
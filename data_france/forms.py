@@ -1,16 +1,94 @@
+import json
+from base64 import urlsafe_b64decode, urlsafe_b64encode
+from functools import lru_cache
+
 from django import forms
+from django.core.exceptions import ImproperlyConfigured, ValidationError
 
 from data_france.models import Commune
+from data_france.recherche_globale import TYPES_RESULTATS
+
+
+def encoder_curseur(valeurs):
+    """Encode la position d'un résultat dans une liste ordonnée en curseur opaque
+
+    :param valeurs: les valeurs des champs d'ordonnancement du résultat
+    """
+    return urlsafe_b64encode(json.dumps(valeurs).encode()).decode()
+
+
+def erreurs_formulaire(form):
+    """Renvoie les erreurs d'un formulaire validé sous forme de données simples
+
+    Le dictionnaire renvoyé, qui associe à chaque champ la liste de ses
+    messages d'erreur, a la même forme que les erreurs de
+    :py:meth:`ParseurParametres.valider`, et peut être sérialisé en JSON comme
+    en msgpack (contrairement aux `ErrorList` de Django).
+    """
+    return {champ: list(erreurs) for champ, erreurs in form.errors.items()}
+
+
+class CurseurField(forms.CharField):
+    """Champ de curseur de pagination, décodé en liste de valeurs"""
+
+    def to_python(self, value):
+        value = super().to_python(value)
+        if not value:
+            return None
+        try:
+            valeurs = json.loads(urlsafe_b64decode(value.encode()))
+        except ValueError:
+            valeurs = None
+        if not isinstance(valeurs, list) or not all(
+            valeur is None or isinstance(valeur, (str, int, float, bool))
+            for valeur in valeurs
+        ):
+            raise ValidationError("Curseur de pagination invalide.", code="invalid")
+        return valeurs
+
 
+class PaginationParametresForm(forms.Form):
+    LIMITE_DEFAUT = 10
+    LIMITE_MAX = 100
 
-class CommuneParametresForm(forms.Form):
+    limit = forms.IntegerField(required=False, min_value=1, max_value=LIMITE_MAX)
+    apres = CurseurField(required=False)
+
+    def clean_limit(self):
+        return self.cleaned_data["limit"] or self.LIMITE_DEFAUT
+
+
+class RechercheParametresForm(PaginationParametresForm):
     q = forms.CharField(required=True)
+    approchee = forms.BooleanField(required=False)
+    highlight = forms.BooleanField(required=False)
+
+
+class CommuneParametresForm(RechercheParametresForm):
     geojson = forms.BooleanField(required=False)
     type = forms.MultipleChoiceField(
         choices=Commune.TypeCommune.choices, required=False,
     )
 
 
+class RechercheGlobaleParametresForm(forms.Form):
+    LIMITE_DEFAUT = 5
+    LIMITE_MAX = 20
+
+    q = forms.CharField(required=True)
+    types = forms.MultipleChoiceField(
+        choices=[(t, t) for t in TYPES_RESULTATS], required=False
+    )
+    limit = forms.IntegerField(required=False, min_value=1, max_value=LIMITE_MAX)
+    highlight = forms.BooleanField(required=False)
+
+    def clean_types(self):
+        return self.cleaned_data["types"] or list(TYPES_RESULTATS)
+
+    def clean_limit(self):
+        return self.cleaned_data["limit"] or self.LIMITE_DEFAUT
+
+
 class ParCodeParametresForm(forms.Form):
     code = forms.CharField(required=True)
     geojson = forms.BooleanField(required=False)
@@ -18,3 +96,88 @@ class ParCodeParametresForm(forms.Form):
 
 class CommuneParCodeParametresForm(ParCodeParametresForm):
     type = forms.ChoiceField(choices=Commune.TypeCommune.choices, required=True)
+
+
+class ListeEntitesParametresForm(forms.Form):
+    geojson = forms.BooleanField(required=False)
+
+
+class ExportParametresForm(forms.Form):
+    FORMAT_NDJSON = "ndjson"
+    FORMAT_CSV = "csv"
+    FORMAT_CHOICES = ((FORMAT_NDJSON, "NDJSON"), (FORMAT_CSV, "CSV"))
+
+    format = forms.ChoiceField(choices=FORMAT_CHOICES, required=False)
+    champs = forms.MultipleChoiceField(required=False)
+
+    def __init__(self, *args, champs, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.fields["champs"].choices = [(c, c) for c in champs]
+
+    def clean_format(self):
+        return self.cleaned_data["format"] or self.FORMAT_NDJSON
+
+
+class LocaliserParametresForm(forms.Form):
+    lat = forms.FloatField(required=True, min_value=-90, max_value=90)
+    lon = forms.FloatField(required=True, min_value=-180, max_value=180)
+
+
+class ParseurParametres:
+    """Validation allégée de paramètres GET selon les champs d'un formulaire
+
+    Produit les mêmes données nettoyées et les mêmes messages d'erreur que le
+    formulaire, sans l'instancier : les champs de la classe sont utilisés
+    directement, sans copie ni construction des `BoundField`. Seuls les champs
+    et les méthodes `clean_<champ>` sont pris en charge ; le formulaire ne doit
+    pas redéfinir `clean`.
+    """
+
+    def __init__(self, form_class):
+        if form_class.clean is not forms.Form.clean:
+            raise ImproperlyConfigured(
+                f"{form_class.__name__} redéfinit `clean` et ne peut pas être "
+                f"validé par {self.__class__.__name__}."
+            )
+
+        self.form_class = form_class
+        self.champs = [
+            (
+                nom,
+                champ.clean,
+                champ.widget.value_from_datadict,
+                getattr(form_class, f"clean_{nom}", None),
+            )
+            for nom, champ in form_class.base_fields.items()
+        ]
+
+    def valider(self, data):
+        """Valide les paramètres
+
+        :param data: le dictionnaire (en général `request.GET`) à valider
+        :return: un couple (données nettoyées, erreurs), les erreurs étant un
+          dictionnaire associant à chaque champ invalide la liste de ses messages
+        """
+        cleaned_data = {}
+        erreurs = {}
+        # instance non initialisée : les méthodes clean_<champ> n'ont besoin que
+        # de cleaned_data et des attributs de classe
+        formulaire = self.form_class.__new__(self.form_class)
+        formulaire.cleaned_data = cleaned_data
+
+        for nom, clean, value_from_datadict, clean_champ in self.champs:
+            try:
+                cleaned_data[nom] = clean(value_from_datadict(data, {}, nom))
+                if clean_champ is not None:
+                    cleaned_data[nom] = clean_champ(formulaire)
+            except ValidationError as e:
+                cleaned_data.pop(nom, None)
+                erreurs[nom] = e.messages
+
+        return cleaned_data, erreurs
+
+
+@lru_cache(maxsize=None)
+def parseur(form_class):
+    """Renvoie le :py:class:`ParseurParametres` associé à une classe de formulaire"""
+    return ParseurParametres(form_class)
@@ -0,0 +1,194 @@
+"""Fonctions géographiques : localisation administrative de points
+
+Le localisateur en mémoire nécessite les dépendances optionnelles `shapely` et
+`numpy` (extra `geo`).
+"""
+import csv
+import lzma
+import sys
+from importlib.resources import open_binary
+from typing import Iterable, List, Optional, Sequence, Tuple
+
+from django.contrib.gis.db.models.functions import AsWKB
+from django.db import connections, DEFAULT_DB_ALIAS
+
+from data_france.models import Commune, CirconscriptionLegislative
+
+try:
+    import numpy as np
+    import shapely
+except ImportError:
+    np = shapely = None
+
+LOCALISER_SQL = """
+SELECT c.id, a.id, cl.id
+FROM unnest(%(lats)s :: float8[], %(lons)s :: float8[]) WITH ORDINALITY AS p(lat, lon, idx)
+CROSS JOIN LATERAL (
+    SELECT ST_SetSRID(ST_MakePoint(p.lon, p.lat), 4326) :: geography AS geog
+) AS pt
+LEFT JOIN LATERAL (
+    SELECT id FROM "data_france_commune"
+    WHERE type = 'COM' AND ST_Intersects(geometry, pt.geog)
+    LIMIT 1
+) AS c ON TRUE
+LEFT JOIN LATERAL (
+    SELECT id FROM "data_france_commune"
+    WHERE type = 'ARM' AND ST_Intersects(geometry, pt.geog)
+    LIMIT 1
+) AS a ON TRUE
+LEFT JOIN LATERAL (
+    SELECT id FROM "data_france_circonscriptionlegislative"
+    WHERE ST_Intersects(geometry, pt.geog)
+    LIMIT 1
+) AS cl ON TRUE
+ORDER BY p.idx;
+"""
+
+
+def chaine_administrative(
+    commune: Commune,
+    arrondissement: Optional[Commune] = None,
+    circonscription: Optional[CirconscriptionLegislative] = None,
+):
+    """Sérialise la chaîne administrative d'une commune (compatible JSON)"""
+    departement = commune.departement
+    region = departement.region
+    epci = commune.epci
+
+    return {
+        "commune": commune.as_dict(),
+        "arrondissement": arrondissement and arrondissement.as_dict(),
+        "epci": epci and {"code": epci.code, "nom": epci.nom, "type": epci.type},
+        "departement": {"code": departement.code, "nom": departement.nom},
+        "region": {"code": region.code, "nom": region.nom},
+        "circonscription_legislative": circonscription
+        and {"code": circonscription.code, "nom": str(circonscription)},
+    }
+
+
+def localiser(
+    points: Iterable[Tuple[float, float]], using: str = DEFAULT_DB_ALIAS
+) -> List[Optional[dict]]:
+    """Localise des points dans les découpages administratifs
+
+    La recherche des entités contenant chacun des points est réalisée en une
+    seule requête, qui utilise les index spatiaux des géométries.
+
+    :param points: une liste de couples (latitude, longitude) en WGS84
+    :param using: l'alias de la base de données à utiliser
+    :return: pour chaque point, dans l'ordre, la chaîne administrative
+      correspondante, ou `None` si le point n'est dans aucune commune.
+    """
+    points = list(points)
+    if not points:
+        return []
+
+    with connections[using].cursor() as cursor:
+        cursor.execute(
+            LOCALISER_SQL,
+            {"lats": [lat for lat, _ in points], "lons": [lon for _, lon in points]},
+        )
+        ids = cursor.fetchall()
+
+    communes = (
+        Commune.objects.using(using)
+        .select_related("departement__region", "epci", "commune_parent__departement")
+        .sans_champs_lourds()
+        .in_bulk({i for c, a, _ in ids for i in (c, a) if i is not None})
+    )
+    circonscriptions = (
+        CirconscriptionLegislative.objects.using(using)
+        .select_related("departement")
+        .sans_champs_lourds()
+        .in_bulk({cl for _, _, cl in ids if cl is not None})
+    )
+
+    return [
+        chaine_administrative(communes[c], communes.get(a), circonscriptions.get(cl))
+        if c is not None
+        else None
+        for c, a, cl in ids
+    ]
+
+
+class Localisateur:
+    """Localisation en masse de points dans les communes, entièrement en mémoire
+
+    Les géométries des communes sont chargées une seule fois dans un index
+    spatial (:py:class:`shapely.STRtree`), qui permet ensuite de localiser des
+    tableaux de coordonnées sans interroger la base de données.
+
+    Nécessite `shapely` (version 2 ou ultérieure) et `numpy`.
+
+    :param codes: les codes des communes
+    :param geometries: les géométries des communes, dans le même ordre
+    :param preparer: si `True`, les géométries sont préparées, ce qui accélère
+      les tests d'inclusion au prix d'un surcoût mémoire et d'initialisation.
+    """
+
+    def __init__(self, codes: Sequence[str], geometries, preparer: bool = False):
+        if shapely is None:
+            raise ImportError("Le localisateur nécessite les paquets shapely et numpy.")
+
+        self.codes = np.asarray(codes, dtype=object)
+        self.geometries = np.asarray(geometries, dtype=object)
+        if preparer:
+            shapely.prepare(self.geometries)
+        self.arbre = shapely.STRtree(self.geometries)
+
+    @classmethod
+    def depuis_base(
+        cls, types=(Commune.TypeCommune.COMMUNE,), using=DEFAULT_DB_ALIAS, **kwargs
+    ):
+        """Construit le localisateur à partir des communes en base de données
+
+        :param types: les types de communes à inclure
+        :param using: l'alias de la base de données à utiliser
+        """
+        codes, wkbs = zip(
+            *Commune.objects.using(using)
+            .filter(type__in=types, geometry__isnull=False)
+            .annotate(wkb=AsWKB("geometry"))
+            .values_list("code", "wkb")
+            .iterator()
+        )
+        return cls(codes, shapely.from_wkb([bytes(w) for w in wkbs]), **kwargs)
+
+    @classmethod
+    def depuis_fichier(cls, types=(Commune.TypeCommune.COMMUNE,), **kwargs):
+        """Construit le localisateur à partir du fichier de communes du paquet
+
+        :param types: les types de communes à inclure
+        """
+        csv.field_size_limit(sys.maxsize)
+
+        with open_binary("data_france.data", "communes.csv.lzma") as _f, lzma.open(
+            _f, "rt"
+        ) as f:
+            lignes = [
+                (ligne["code"], ligne["geometry"])
+                for ligne in csv.DictReader(f)
+                if ligne["type"] in types and ligne["geometry"] not in ("", "\\N")
+            ]
+
+        codes, wkbs = zip(*lignes)
+        return cls(codes, shapely.from_wkb(wkbs), **kwargs)
+
+    def localiser(self, lats, lons):
+        """Localise des points dans les communes
+
+        :param lats: un tableau de latitudes (WGS84)
+        :param lons: un tableau de longitudes (WGS84), de même taille
+        :return: un tableau des codes des communes contenant chacun des points,
+          avec `None` pour les points situés hors de toute commune
+        """
+        points = shapely.points(np.asarray(lons), np.asarray(lats))
+        resultats = np.full(len(points), None, dtype=object)
+
+        # l'index ne renvoie que les candidats dont l'emprise contient le point,
+        # le test d'inclusion exact est ensuite fait de façon vectorisée
+        idx_points, idx_communes = self.arbre.query(points)
+        inclus = shapely.intersects(self.geometries[idx_communes], points[idx_points])
+
+        resultats[idx_points[inclus]] = self.codes[idx_communes[inclus]]
+        return resultats
@@ -0,0 +1,37 @@
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("data_france", "0029_deputes_europeens"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="VersionDonnees",
+            fields=[
+                (
+                    "id",
+                    models.AutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                (
+                    "date",
+                    models.DateTimeField(
+                        editable=False, verbose_name="Date de l'import"
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "Version des données",
+                "verbose_name_plural": "Versions des données",
+                "ordering": ("-date",),
+                "get_latest_by": "date",
+            },
+        ),
+    ]
@@ -0,0 +1,32 @@
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("data_france", "0030_versiondonnees"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="eludepartemental",
+            index=models.Index(
+                fields=["canton", "nom", "prenom", "id"],
+                name="data_france_canton__dc48da_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="elumunicipal",
+            index=models.Index(
+                fields=["commune", "nom", "prenom", "id"],
+                name="data_france_commune_efb7d5_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="eluregional",
+            index=models.Index(
+                fields=["region", "nom", "prenom", "id"],
+                name="data_france_region__a6fa25_idx",
+            ),
+        ),
+    ]
@@ -0,0 +1,30 @@
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("data_france", "0031_index_elus"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="DocumentPrecalcule",
+            fields=[
+                (
+                    "cle",
+                    models.CharField(
+                        max_length=100,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="Clé",
+                    ),
+                ),
+                ("contenu", models.TextField(verbose_name="Contenu JSON")),
+            ],
+            options={
+                "verbose_name": "Document précalculé",
+                "verbose_name_plural": "Documents précalculés",
+            },
+        ),
+    ]
@@ -0,0 +1,37 @@
+from django.contrib.postgres.operations import TrigramExtension
+from django.db import migrations
+
+# la fonction unaccent à deux arguments n'est que STABLE : il faut la déclarer dans
+# une fonction IMMUTABLE pour pouvoir l'utiliser dans un index
+create_normaliser_func = """
+CREATE FUNCTION data_france_normaliser(text) RETURNS text AS $$
+  SELECT trim(regexp_replace(lower(unaccent('unaccent', $1)), '[^a-z0-9]+', ' ', 'g'))
+$$ LANGUAGE sql IMMUTABLE STRICT PARALLEL SAFE;
+"""
+
+drop_normaliser_func = "DROP FUNCTION data_france_normaliser(text);"
+
+add_trigram_indexes = """
+CREATE INDEX data_france_commune_nom_trgm_index ON data_france_commune
+USING GIN (data_france_normaliser("nom") gin_trgm_ops);
+CREATE INDEX data_france_elumunicipal_nom_trgm_index ON data_france_elumunicipal
+USING GIN (data_france_normaliser("prenom" || ' ' || "nom") gin_trgm_ops);
+"""
+
+drop_trigram_indexes = """
+DROP INDEX data_france_commune_nom_trgm_index;
+DROP INDEX data_france_elumunicipal_nom_trgm_index;
+"""
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("data_france", "0032_documentprecalcule"),
+    ]
+
+    operations = [
+        TrigramExtension(),
+        migrations.RunSQL(sql=create_normaliser_func, reverse_sql=drop_normaliser_func),
+        migrations.RunSQL(sql=add_trigram_indexes, reverse_sql=drop_trigram_indexes),
+    ]
@@ -0,0 +1,37 @@
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("data_france", "0033_recherche_approchee"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="commune",
+            name="rang_recherche",
+            field=models.FloatField(
+                default=0, editable=False, verbose_name="Rang statique de recherche"
+            ),
+        ),
+        migrations.AddField(
+            model_name="elumunicipal",
+            name="rang_recherche",
+            field=models.FloatField(
+                default=0, editable=False, verbose_name="Rang statique de recherche"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="commune",
+            index=models.Index(
+                fields=["-rang_recherche", "id"], name="data_france_rang_re_0fefab_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="elumunicipal",
+            index=models.Index(
+                fields=["-rang_recherche", "id"], name="data_france_rang_re_a20112_idx"
+            ),
+        ),
+    ]
@@ -0,0 +1,21 @@
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("data_france", "0034_rang_recherche"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="commune",
+            name="popularite",
+            field=models.FloatField(
+                default=0,
+                editable=False,
+                help_text="Score entre 0 et 1 dérivé de la population, utilisé pour ordonner les résultats de recherche.",
+                verbose_name="Popularité",
+            ),
+        ),
+    ]
@@ -0,0 +1,104 @@
+import django.contrib.postgres.indexes
+import django.contrib.postgres.search
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("data_france", "0035_commune_popularite"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="canton",
+            name="search",
+            field=django.contrib.postgres.search.SearchVectorField(
+                editable=False, null=True, verbose_name="Champ de recherche"
+            ),
+        ),
+        migrations.AddField(
+            model_name="departement",
+            name="search",
+            field=django.contrib.postgres.search.SearchVectorField(
+                editable=False, null=True, verbose_name="Champ de recherche"
+            ),
+        ),
+        migrations.AddField(
+            model_name="depute",
+            name="search",
+            field=django.contrib.postgres.search.SearchVectorField(
+                editable=False, null=True, verbose_name="Champ de recherche"
+            ),
+        ),
+        migrations.AddField(
+            model_name="eludepartemental",
+            name="search",
+            field=django.contrib.postgres.search.SearchVectorField(
+                editable=False, null=True, verbose_name="Champ de recherche"
+            ),
+        ),
+        migrations.AddField(
+            model_name="eluregional",
+            name="search",
+            field=django.contrib.postgres.search.SearchVectorField(
+                editable=False, null=True, verbose_name="Champ de recherche"
+            ),
+        ),
+        migrations.AddField(
+            model_name="epci",
+            name="search",
+            field=django.contrib.postgres.search.SearchVectorField(
+                editable=False, null=True, verbose_name="Champ de recherche"
+            ),
+        ),
+        migrations.AddField(
+            model_name="region",
+            name="search",
+            field=django.contrib.postgres.search.SearchVectorField(
+                editable=False, null=True, verbose_name="Champ de recherche"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="canton",
+            index=django.contrib.postgres.indexes.GinIndex(
+                fields=["search"], name="data_france_search_443013_gin"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="departement",
+            index=django.contrib.postgres.indexes.GinIndex(
+                fields=["search"], name="data_france_search_e022a0_gin"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="depute",
+            index=django.contrib.postgres.indexes.GinIndex(
+                fields=["search"], name="data_france_search_cc6898_gin"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="eludepartemental",
+            index=django.contrib.postgres.indexes.GinIndex(
+                fields=["search"], name="data_france_search_b96df3_gin"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="eluregional",
+            index=django.contrib.postgres.indexes.GinIndex(
+                fields=["search"], name="data_france_search_06a305_gin"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="epci",
+            index=django.contrib.postgres.indexes.GinIndex(
+                fields=["search"], name="data_france_search_2248eb_gin"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="region",
+            index=django.contrib.postgres.indexes.GinIndex(
+                fields=["search"], name="data_france_search_81bc26_gin"
+            ),
+        ),
+    ]
@@ -0,0 +1,22 @@
+from django.db import migrations
+
+create_vecteur_func = """
+CREATE FUNCTION data_france_vecteur_recherche(text) RETURNS tsvector AS $$
+  SELECT to_tsvector('data_france_search', data_france_normaliser($1))
+$$ LANGUAGE sql IMMUTABLE STRICT PARALLEL SAFE;
+COMMENT ON FUNCTION data_france_vecteur_recherche(text)
+IS 'Vecteur de recherche d''un texte normalisé comme les termes des requêtes (data_france)';
+"""
+
+drop_vecteur_func = "DROP FUNCTION data_france_vecteur_recherche(text);"
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("data_france", "0036_recherche_autres_entites"),
+    ]
+
+    operations = [
+        migrations.RunSQL(sql=create_vecteur_func, reverse_sql=drop_vecteur_func),
+    ]
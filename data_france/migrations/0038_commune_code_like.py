@@ -0,0 +1,19 @@
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("data_france", "0037_vecteur_recherche"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="commune",
+            index=models.Index(
+                fields=["code"],
+                name="data_france_commune_code_like",
+                opclasses=["text_pattern_ops"],
+            ),
+        ),
+    ]
@@ -0,0 +1,76 @@
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("data_france", "0038_commune_code_like"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="depute",
+            index=models.Index(
+                fields=["nom", "prenom", "id"], name="data_france_nom_5d4bab_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="depute",
+            index=models.Index(
+                fields=["circonscription", "nom", "prenom", "id"],
+                name="data_france_circons_2395a4_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="depute",
+            index=models.Index(
+                fields=["groupe", "nom", "prenom", "id"],
+                name="data_france_groupe_297415_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="deputeeuropeen",
+            index=models.Index(
+                fields=["nom", "prenom", "id"], name="data_france_nom_95b39e_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="eludepartemental",
+            index=models.Index(
+                fields=["nom", "prenom", "id"], name="data_france_nom_579b8b_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="eludepartemental",
+            index=models.Index(
+                fields=["fonction", "nom", "prenom", "id"],
+                name="data_france_fonctio_16ee9f_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="elumunicipal",
+            index=models.Index(
+                fields=["nom", "prenom", "id"], name="data_france_nom_fa1f22_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="elumunicipal",
+            index=models.Index(
+                fields=["fonction", "nom", "prenom", "id"],
+                name="data_france_fonctio_936f43_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="eluregional",
+            index=models.Index(
+                fields=["nom", "prenom", "id"], name="data_france_nom_7e15e8_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="eluregional",
+            index=models.Index(
+                fields=["fonction", "nom", "prenom", "id"],
+                name="data_france_fonctio_8b0380_idx",
+            ),
+        ),
+    ]
@@ -1,11 +1,23 @@
-from django.contrib.gis.db.models import MultiPolygonField, PointField
+from django.contrib.gis.db.models import GeometryField, MultiPolygonField, PointField
 from django.contrib.postgres.fields.array import ArrayField
 from django.contrib.postgres.indexes import GinIndex
-from django.contrib.postgres.search import SearchRank, SearchVectorField
+from django.contrib.postgres.search import (
+    SearchRank,
+    SearchVectorField,
+    TrigramSimilarity,
+)
+from django.conf import settings
 from django.db import models
+from django.db.models.functions import Cast
 from django.utils.html import format_html_join
 
-from .search import PrefixSearchQuery
+from .search import (
+    Normaliser,
+    PrefixSearchQuery,
+    TrigrammesSimilaires,
+    normaliser_texte,
+    prefixe_code,
+)
 from .typologies import CodeSexe, Fonction, RelationGroupe
 from .utils import ORDINAUX_LETTRES, JOURS_SEMAINE, NomType, TypeNom, genrer
 
@@ -23,6 +35,8 @@ __all__ = [
     "CirconscriptionConsulaire",
     "Depute",
     "EluMunicipal",
+    "VersionDonnees",
+    "DocumentPrecalcule",
 ]
 
 
@@ -36,6 +50,25 @@ NOMS_COM = {
 }
 
 
+# poids par défaut de la popularité des communes dans l'ordre des résultats de
+# recherche (réglage DATA_FRANCE_POIDS_POPULARITE)
+POIDS_POPULARITE = 1.0
+
+
+def poids_popularite():
+    """Renvoie le poids de la popularité dans l'ordre des résultats de recherche
+
+    Le rang d'une commune est multiplié par `1 + poids * popularite` ; un poids
+    nul ordonne les résultats selon leur seule pertinence textuelle.
+
+    Le poids est aussi intégré, lors de l'import, au rang statique
+    `rang_recherche` qui ordonne les recherches par préfixe court et par début de
+    code : après toute modification du réglage, il faut réimporter les données
+    pour que ces recherches restent ordonnées comme les autres.
+    """
+    return getattr(settings, "DATA_FRANCE_POIDS_POPULARITE", POIDS_POPULARITE)
+
+
 def _horaires_sort_key(j):
     return (JOURS_SEMAINE.index(j[0]), JOURS_SEMAINE.index(j[1]), tuple(j[2]))
 
@@ -93,6 +126,15 @@ class IdentiteMixin(models.Model):
         verbose_name="Profession", editable=False, null=True
     )
 
+    def as_dict(self):
+        """Sérialise l'instance (compatible JSON)"""
+        return {
+            "id": self.id,
+            "nom": self.nom,
+            "prenom": self.prenom,
+            "sexe": self.sexe,
+        }
+
     class Meta:
         abstract = True
 
@@ -128,22 +170,231 @@ class RNEMixin(models.Model):
         abstract = True
 
 
-class SearchQueryset(models.QuerySet):
-    def search(self, termes: str):
+def _champs_lourds(model, prefixe=""):
+    """Renvoie les noms des colonnes volumineuses d'un modèle
+
+    Il s'agit des géométries, des vecteurs de recherche et des champs JSON.
+    """
+    return [
+        f"{prefixe}{f.name}"
+        for f in model._meta.concrete_fields
+        if isinstance(f, (GeometryField, SearchVectorField, models.JSONField))
+    ]
+
+
+def _champs_lourds_relations(model, relations, prefixe=""):
+    for nom, sous_relations in relations.items():
+        related_model = model._meta.get_field(nom).related_model
+        prefixe_relation = f"{prefixe}{nom}__"
+        yield from _champs_lourds(related_model, prefixe_relation)
+        yield from _champs_lourds_relations(
+            related_model, sous_relations, prefixe_relation
+        )
+
+
+class DataFranceQueryset(models.QuerySet):
+    def sans_champs_lourds(self, *conserver: str):
+        """Diffère le chargement des colonnes volumineuses
+
+        Les géométries, vecteurs de recherche et champs JSON du modèle ne sont pas
+        chargés, ainsi que ceux des modèles liés inclus par `select_related` :
+        cette méthode doit donc être appelée après :py:meth:`select_related`.
+
+        Les champs différés restent accessibles, au prix d'une requête
+        supplémentaire par instance.
+
+        :param conserver: les noms des champs qui doivent malgré tout être chargés,
+          par exemple `"geometry"`
+        :return: le queryset modifié
+        """
+        champs = _champs_lourds(self.model)
+        if isinstance(self.query.select_related, dict):
+            champs.extend(
+                _champs_lourds_relations(self.model, self.query.select_related)
+            )
+
+        return self.defer(*(c for c in champs if c not in conserver))
+
+    def cle(self, instance):
+        """Renvoie les valeurs des champs d'ordonnancement du queryset pour une instance
+
+        :param instance: une instance renvoyée par ce queryset
+        :return: la liste des valeurs, utilisable avec :py:meth:`apres`
+        """
+        return [getattr(instance, champ.lstrip("-")) for champ in self.query.order_by]
+
+    def apres(self, *valeurs):
+        """Restreint le queryset aux résultats qui suivent une position donnée
+
+        Permet une pagination par clé qui ne nécessite pas de parcourir les
+        résultats des pages précédentes, contrairement à un décalage. Le queryset
+        doit être explicitement ordonné (avec :py:meth:`order_by`) selon des champs
+        locaux, dont le dernier doit être unique.
+
+        :param valeurs: les valeurs des champs d'ordonnancement du dernier résultat
+          de la page précédente (voir :py:meth:`cle`)
+        :return: le queryset restreint aux résultats suivants
+        """
+        ordre = self.query.order_by
+        if len(valeurs) != len(ordre):
+            raise ValueError(
+                "Il faut autant de valeurs que de champs d'ordonnancement."
+            )
+
+        condition = models.Q()
+        egalites = {}
+        for champ, valeur in zip(ordre, valeurs):
+            nom = champ.lstrip("-")
+            comparaison = "lt" if champ.startswith("-") else "gt"
+            condition |= models.Q(**egalites, **{f"{nom}__{comparaison}": valeur})
+            egalites[nom] = valeur
+
+        return self.filter(condition)
+
+
+class SearchQueryset(DataFranceQueryset):
+    # nombre de résultats en deçà duquel la recherche approchée est effectuée
+    SEUIL_RECHERCHE_APPROCHEE = 10
+    # longueur maximale des préfixes ordonnés selon le rang statique
+    LONGUEUR_PREFIXE_COURT = 3
+
+    def search(self, termes: str, geometrie: bool = False, approchee: bool = False):
         """Réalise une recherche plein texte dans le queryset
 
         :param termes: Les termes à rechercher
+        :param geometrie: si `False`, les colonnes volumineuses, dont la géométrie,
+          ne sont pas chargées (voir :py:meth:`sans_champs_lourds`)
+        :param approchee: si `True` et que la recherche plein texte renvoie moins
+          de :py:attr:`SEUIL_RECHERCHE_APPROCHEE` résultats, y ajoute les résultats
+          dont le nom est proche des termes recherchés (voir
+          :py:meth:`_recherche_approchee`) ; le seuil ne tient compte que des
+          filtres appliqués au queryset *avant* l'appel à `search`
         :return: le queryset filtré et ordonné selon les termes à rechercher
         """
         query = PrefixSearchQuery(termes, config="data_france_search")
+        rank = SearchRank(models.F("search"), query, normalization=8)
+
+        poids = poids_popularite()
+        if poids and any(f.name == "popularite" for f in self.model._meta.fields):
+            rank = rank * (1 + poids * models.F("popularite"))
+
+        if not approchee and self._prefixe_court(termes):
+            # un préfixe très court correspond à une grande partie des lignes :
+            # plutôt que de calculer et trier le rang de chacune, on les parcourt
+            # dans l'ordre de l'index sur le rang statique, qui tient déjà compte
+            # de la popularité
+            rank = models.F("rang_recherche")
+
+        if approchee:
+            qs, similarite = self._recherche_approchee(termes, query)
+            rank = rank + similarite
+        else:
+            qs = self.filter(search=query)
+
+        # le rang est converti en double précision : ts_rank renvoie un `real`, qui
+        # ne serait pas comparé exactement à la valeur du curseur de pagination
+        qs = qs.annotate(rank=Cast(rank, models.FloatField())).order_by("-rank", "id")
+
+        if geometrie:
+            return qs
+        return qs.sans_champs_lourds()
+
+    def _prefixe_court(self, termes):
+        """Indique si les termes forment un préfixe court ordonnable par rang statique
+
+        Seuls les modèles disposant d'un champ `rang_recherche` (voir
+        :py:func:`data_france.data.creer_index_recherche`) sont concernés.
+        """
+        if not any(f.name == "rang_recherche" for f in self.model._meta.fields):
+            return False
+        mots = normaliser_texte(termes).split()
+        return len(mots) == 1 and len(mots[0]) <= self.LONGUEUR_PREFIXE_COURT
+
+    def _recherche_approchee(self, termes, query):
+        """Ajoute aux résultats de la recherche plein texte ceux de la recherche par trigrammes
+
+        Les deux recherches sont réunies dans une même requête. La recherche par
+        trigrammes, sur les champs `champs_recherche_approchee` du modèle, n'est
+        exécutée par PostgreSQL que si la recherche plein texte renvoie moins de
+        :py:attr:`SEUIL_RECHERCHE_APPROCHEE` résultats.
+
+        :return: un couple (queryset filtré, expression de similarité des noms)
+        """
+        champs = getattr(self.model, "champs_recherche_approchee", None)
+        if not champs:
+            raise ValueError(
+                f"La recherche approchée n'est pas disponible pour le modèle "
+                f"{self.model.__name__}."
+            )
+
+        normalise = Normaliser(*champs)
+        termes_normalises = Normaliser(models.Value(termes))
+
+        exacts = self.filter(search=query).order_by().values("id")
+        # l'identifiant du N-ième résultat exact, NULL s'il y en a moins de N
+        nieme = exacts[
+            self.SEUIL_RECHERCHE_APPROCHEE - 1 : self.SEUIL_RECHERCHE_APPROCHEE
+        ]
+        approches = (
+            self.annotate(nieme_exact=models.Subquery(nieme))
+            .filter(
+                TrigrammesSimilaires(normalise, termes_normalises),
+                nieme_exact__isnull=True,
+            )
+            .order_by()
+            .values("id")
+        )
 
         return (
-            self.filter(search=query)
-            .annotate(rank=SearchRank(models.F("search"), query, normalization=8))
-            .order_by("-rank")
+            self.filter(id__in=exacts.union(approches, all=True)),
+            TrigramSimilarity(normalise, termes_normalises),
         )
 
 
+class CommuneQueryset(SearchQueryset):
+    def search(self, termes: str, geometrie: bool = False, approchee: bool = False):
+        """Réalise une recherche dans le queryset
+
+        Les termes formés d'un unique nombre (voir
+        :py:func:`~data_france.search.prefixe_code`) sont recherchés comme début
+        de code INSEE ou de code postal (voir :py:meth:`recherche_code`), sauf en
+        recherche approchée ; les autres par une recherche plein texte (voir
+        :py:meth:`SearchQueryset.search`).
+        """
+        prefixe = prefixe_code(termes)
+        if prefixe is not None and not approchee:
+            return self.recherche_code(prefixe, geometrie=geometrie)
+        return super().search(termes, geometrie=geometrie, approchee=approchee)
+
+    def recherche_code(self, prefixe: str, geometrie: bool = False):
+        """Renvoie les communes dont le code INSEE ou l'un des codes postaux commence par un préfixe
+
+        Les deux recherches utilisent des index B-tree compatibles avec `LIKE`
+        plutôt que les vecteurs de recherche. Les résultats sont ordonnés selon le
+        rang statique des communes, comme ceux d'une recherche par préfixe court,
+        et annotés de ce rang (`rank`) : ils peuvent être paginés de la même façon.
+
+        :param prefixe: le début de code recherché
+        :param geometrie: si `False`, les colonnes volumineuses, dont la géométrie,
+          ne sont pas chargées (voir :py:meth:`sans_champs_lourds`)
+        """
+        par_code_postal = CodePostal.communes.through.objects.filter(
+            codepostal__code__startswith=prefixe
+        ).values("commune_id")
+
+        qs = (
+            self.filter(
+                models.Q(code__startswith=prefixe) | models.Q(id__in=par_code_postal)
+            )
+            .annotate(rank=models.F("rang_recherche"))
+            .order_by("-rank", "id")
+        )
+
+        if geometrie:
+            return qs
+        return qs.sans_champs_lourds()
+
+
 class Commune(TypeNomMixin, models.Model):
     class TypeCommune(models.TextChoices):
         """Enum des différents types d'entité référencées comme communes"""
@@ -160,7 +411,9 @@ class Commune(TypeNomMixin, models.Model):
     TYPE_ARRONDISSEMENT_PLM = TypeCommune.ARRONDISSEMENT_PLM
     TYPE_SECTEUR_PLM = TypeCommune.SECTEUR_PLM
 
-    objects = SearchQueryset.as_manager()
+    objects = CommuneQueryset.as_manager()
+    # champs indexés par trigrammes pour la recherche approchée
+    champs_recherche_approchee = ("nom",)
 
     code = models.CharField("Code INSEE", max_length=10, editable=False)
     type = models.CharField(
@@ -265,6 +518,16 @@ class Commune(TypeNomMixin, models.Model):
     mairie_site = models.URLField("Site web de la mairie", blank=True)
 
     search = SearchVectorField("Champ de recherche", null=True, editable=False)
+    rang_recherche = models.FloatField(
+        verbose_name="Rang statique de recherche", default=0, editable=False
+    )
+    popularite = models.FloatField(
+        verbose_name="Popularité",
+        default=0,
+        editable=False,
+        help_text="Score entre 0 et 1 dérivé de la population, utilisé pour ordonner "
+        "les résultats de recherche.",
+    )
 
     @property
     def avec_conseil(self) -> bool:
@@ -316,7 +579,16 @@ class Commune(TypeNomMixin, models.Model):
 
         ordering = ("code", "nom", "type")
 
-        indexes = (GinIndex(fields=["search"]),)
+        indexes = (
+            GinIndex(fields=["search"]),
+            models.Index(fields=["-rang_recherche", "id"]),
+            # recherche par début de code (LIKE 'xxx%')
+            models.Index(
+                fields=["code"],
+                name="data_france_commune_code_like",
+                opclasses=["text_pattern_ops"],
+            ),
+        )
         constraints = (
             models.CheckConstraint(
                 check=(
@@ -351,6 +623,8 @@ class EPCI(models.Model):
     TYPE_CU = "CU"
     TYPE_METROPOLE = "ME"
 
+    objects = SearchQueryset.as_manager()
+
     code = models.CharField("Code SIREN", max_length=10, editable=False, unique=True)
 
     type = models.CharField("Type d'EPCI", max_length=2, choices=TypeEPCI.choices)
@@ -363,6 +637,8 @@ class EPCI(models.Model):
         "Géométrie", geography=True, srid=4326, null=True, spatial_index=True
     )
 
+    search = SearchVectorField("Champ de recherche", null=True, editable=False)
+
     def __str__(self):
         return f"{self.nom} ({self.code})"
 
@@ -381,9 +657,12 @@ class EPCI(models.Model):
         verbose_name_plural = "EPCI"
 
         ordering = ("code", "nom")
+        indexes = (GinIndex(fields=["search"]),)
 
 
 class Departement(TypeNomMixin, models.Model):
+    objects = SearchQueryset.as_manager()
+
     code = models.CharField("Code INSEE", max_length=3, editable=False, unique=True)
     nom = models.CharField("Nom du département", max_length=200, editable=False)
 
@@ -408,6 +687,8 @@ class Departement(TypeNomMixin, models.Model):
         "Géométrie", geography=True, srid=4326, null=True, spatial_index=True
     )
 
+    search = SearchVectorField("Champ de recherche", null=True, editable=False)
+
     def __str__(self):
         return f"{self.nom} ({self.code})"
 
@@ -425,9 +706,12 @@ class Departement(TypeNomMixin, models.Model):
     class Meta:
         verbose_name = "Département"
         ordering = ("code",)
+        indexes = (GinIndex(fields=["search"]),)
 
 
 class Region(TypeNomMixin, models.Model):
+    objects = SearchQueryset.as_manager()
+
     code = models.CharField("Code INSEE", max_length=3, editable=False, unique=True)
     nom = models.CharField("Nom de la région", max_length=200, editable=False)
 
@@ -443,6 +727,8 @@ class Region(TypeNomMixin, models.Model):
 
     geometry = MultiPolygonField("Géométrie", geography=True, srid=4326, null=True)
 
+    search = SearchVectorField("Champ de recherche", null=True, editable=False)
+
     def __str__(self):
         return self.nom
 
@@ -460,9 +746,12 @@ class Region(TypeNomMixin, models.Model):
     class Meta:
         verbose_name = "Région"
         ordering = ("nom",)  # personne ne connait les codes de région
+        indexes = (GinIndex(fields=["search"]),)
 
 
 class CodePostal(models.Model):
+    objects = DataFranceQueryset.as_manager()
+
     code = models.CharField("Code postal", max_length=5, editable=False, unique=True)
 
     communes = models.ManyToManyField(
@@ -495,6 +784,8 @@ class CollectiviteDepartementale(TypeNomMixin, models.Model):
         (TYPE_STATUT_PARTICULIER, "Collectivité à statut particulier"),
     )
 
+    objects = DataFranceQueryset.as_manager()
+
     code = models.CharField("Code INSEE", max_length=4, unique=True)
     type = models.CharField(
         "Type de collectivité départementale", max_length=1, choices=TYPE_CHOICES
@@ -538,6 +829,8 @@ class CollectiviteRegionale(TypeNomMixin, models.Model):
         (TYPE_COLLECTIVITE_UNIQUE, "Collectivité territoriale unique"),
     )
 
+    objects = DataFranceQueryset.as_manager()
+
     code = models.CharField("Code INSEE", max_length=4, unique=True)
     type = models.CharField("Type de collectivité", max_length=1, choices=TYPE_CHOICES)
 
@@ -592,6 +885,8 @@ class Canton(TypeNomMixin, models.Model):
         (COMPOSITION_FRACTIONS, "Canton composé de fractions de plusieurs communes"),
     )
 
+    objects = SearchQueryset.as_manager()
+
     code = models.CharField("Code INSEE", max_length=5, unique=True)
     type = models.CharField(
         "Type de canton",
@@ -629,14 +924,19 @@ class Canton(TypeNomMixin, models.Model):
         related_query_name="bureau_centralisateur_de",
     )
 
+    search = SearchVectorField("Champ de recherche", null=True, editable=False)
+
     def __str__(self):
         return f"Canton {self.nom_avec_charniere} ({self.code})"
 
     class Meta:
         ordering = ("code",)
+        indexes = (GinIndex(fields=["search"]),)
 
 
 class CirconscriptionLegislative(models.Model):
+    objects = DataFranceQueryset.as_manager()
+
     code = models.CharField(
         verbose_name="Numéro de la circonscription",
         max_length=10,
@@ -764,16 +1064,37 @@ class Depute(IdentiteMixin, models.Model):
         verbose_name="Date de fin du mandat", null=True, editable=False
     )
 
+    search = SearchVectorField("Champ de recherche", null=True, editable=False)
+
     def __str__(self):
         return f"{self.nom}, {self.prenom} ({self.circonscription})"
 
+    def as_dict(self):
+        return {
+            **super().as_dict(),
+            "groupe": self.groupe,
+            "parti": self.parti,
+            "circonscription": {
+                "code": self.circonscription.code,
+                "nom": str(self.circonscription),
+            },
+        }
+
     class Meta:
         verbose_name = "Député⋅e"
         ordering = ("nom", "prenom")
+        indexes = (
+            GinIndex(fields=["search"]),
+            models.Index(fields=["nom", "prenom", "id"]),
+            models.Index(fields=["circonscription", "nom", "prenom", "id"]),
+            models.Index(fields=["groupe", "nom", "prenom", "id"]),
+        )
 
 
 class EluMunicipal(IdentiteMixin, RNEMixin):
     objects = SearchQueryset.as_manager()
+    # champs indexés par trigrammes pour la recherche approchée
+    champs_recherche_approchee = ("prenom", "nom")
 
     commune = models.ForeignKey(
         to="Commune",
@@ -814,6 +1135,9 @@ class EluMunicipal(IdentiteMixin, RNEMixin):
     )
 
     search = SearchVectorField(verbose_name="Champ de recherche", null=True)
+    rang_recherche = models.FloatField(
+        verbose_name="Rang statique de recherche", default=0, editable=False
+    )
 
     @property
     def elu_epci(self):
@@ -822,28 +1146,65 @@ class EluMunicipal(IdentiteMixin, RNEMixin):
     def __str__(self):
         return f"{self.nom}, {self.prenom} ({self.commune.nom_complet})"
 
+    def as_dict(self):
+        return {
+            **super().as_dict(),
+            "fonction": self.libelle_fonction,
+            "fonction_epci": self.fonction_epci,
+            "commune": {
+                "code": self.commune.code,
+                "type": self.commune.type,
+                "nom": self.commune.nom_complet,
+            },
+        }
+
     class Meta:
         verbose_name = "Élu⋅e municipal⋅e"
         verbose_name_plural = "Élu⋅es municipaux⋅les"
         ordering = ("commune", "nom", "prenom", "date_naissance")
-        indexes = (GinIndex(fields=["search"]),)
+        indexes = (
+            GinIndex(fields=["search"]),
+            models.Index(fields=["commune", "nom", "prenom", "id"]),
+            models.Index(fields=["nom", "prenom", "id"]),
+            models.Index(fields=["fonction", "nom", "prenom", "id"]),
+            models.Index(fields=["-rang_recherche", "id"]),
+        )
 
 
 class EluDepartemental(IdentiteMixin, RNEMixin):
+    objects = SearchQueryset.as_manager()
+
     canton = models.ForeignKey(
         Canton, related_name="elus", related_query_name="elu", on_delete=models.CASCADE
     )
 
+    search = SearchVectorField("Champ de recherche", null=True, editable=False)
+
     def __str__(self):
         return f"{self.nom}, {self.prenom}, {self.canton}"
 
+    def as_dict(self):
+        return {
+            **super().as_dict(),
+            "fonction": self.libelle_fonction,
+            "canton": {"code": self.canton.code, "nom": self.canton.nom_complet},
+        }
+
     class Meta:
         verbose_name = "Élu‧e départemental‧e"
         verbose_name_plural = "Élu‧es départementaux‧ales"
         ordering = ("canton", "nom", "prenom", "date_naissance")
+        indexes = (
+            GinIndex(fields=["search"]),
+            models.Index(fields=["canton", "nom", "prenom", "id"]),
+            models.Index(fields=["nom", "prenom", "id"]),
+            models.Index(fields=["fonction", "nom", "prenom", "id"]),
+        )
 
 
 class EluRegional(IdentiteMixin, RNEMixin):
+    objects = SearchQueryset.as_manager()
+
     region = models.ForeignKey(
         Region,
         related_name="elus",
@@ -851,16 +1212,33 @@ class EluRegional(IdentiteMixin, RNEMixin):
         on_delete=models.CASCADE,
     )
 
+    search = SearchVectorField("Champ de recherche", null=True, editable=False)
+
     def __str__(self):
         return f"{self.nom}, {self.nom}, {self.region}"
 
+    def as_dict(self):
+        return {
+            **super().as_dict(),
+            "fonction": self.libelle_fonction,
+            "region": {"code": self.region.code, "nom": self.region.nom},
+        }
+
     class Meta:
         verbose_name = "Élu‧e régional‧e"
         verbose_name_plural = "Élu‧es régionaux‧ales"
         ordering = ("region", "nom", "prenom", "date_naissance")
+        indexes = (
+            GinIndex(fields=["search"]),
+            models.Index(fields=["region", "nom", "prenom", "id"]),
+            models.Index(fields=["nom", "prenom", "id"]),
+            models.Index(fields=["fonction", "nom", "prenom", "id"]),
+        )
 
 
 class DeputeEuropeen(IdentiteMixin):
+    objects = DataFranceQueryset.as_manager()
+
     date_debut_mandat = models.DateField(
         verbose_name="Date de début du mandat", editable=False
     )
@@ -874,3 +1252,41 @@ class DeputeEuropeen(IdentiteMixin):
         verbose_name = "Député‧e européen‧ne"
         verbose_name = "Député‧es européen‧es"
         ordering = ("nom", "prenom", "date_naissance")
+        indexes = (models.Index(fields=["nom", "prenom", "id"]),)
+
+
+class VersionDonnees(models.Model):
+    """Trace de chaque import des données par :py:func:`data_france.data.importer_donnees`
+
+    La dernière ligne de cette table identifie la version des données
+    actuellement chargées ; elle est utilisée pour le cache HTTP des vues.
+    """
+
+    date = models.DateTimeField(verbose_name="Date de l'import", editable=False)
+
+    def __str__(self):
+        return f"Import du {self.date:%d/%m/%Y %H:%M}"
+
+    class Meta:
+        verbose_name = "Version des données"
+        verbose_name_plural = "Versions des données"
+        ordering = ("-date",)
+        get_latest_by = "date"
+
+
+class DocumentPrecalcule(models.Model):
+    """Document JSON calculé lors de l'import des données
+
+    Ces documents (voir :py:mod:`data_france.documents`) sont renvoyés tels quels
+    par les vues, sans sérialisation.
+    """
+
+    cle = models.CharField(verbose_name="Clé", max_length=100, primary_key=True)
+    contenu = models.TextField(verbose_name="Contenu JSON")
+
+    def __str__(self):
+        return self.cle
+
+    class Meta:
+        verbose_name = "Document précalculé"
+        verbose_name_plural = "Documents précalculés"
@@ -0,0 +1,214 @@
+"""Recherche simultanée dans plusieurs types d'entités
+
+Les meilleurs résultats de chaque type d'entité sont obtenus par une unique
+requête, qui réunit (`UNION ALL`) une sous-requête limitée par type. Chaque
+sous-requête renvoie directement le document JSON de ses résultats : le document
+précalculé de l'entité (voir :py:mod:`data_france.documents`), ou, pour les élus,
+un objet construit par PostgreSQL à partir des seules colonnes nécessaires.
+"""
+import json
+
+from django.db import models
+from django.db.models.functions import Concat
+
+from data_france.documents import ENTITES
+from data_france.models import (
+    Commune,
+    EPCI,
+    Departement,
+    Region,
+    CodePostal,
+    EluMunicipal,
+    DocumentPrecalcule,
+)
+from data_france.search import normaliser_texte
+
+TYPES_RESULTATS = (
+    "communes",
+    "epci",
+    "departements",
+    "regions",
+    "codes-postaux",
+    "elus-municipaux",
+)
+
+
+class ObjetJSON(models.Func):
+    """Construit un objet JSON (sérialisé) à partir de couples clé, expression
+
+    :param champs: les expressions à inclure, par clé
+    """
+
+    function = "json_build_object"
+    template = "%(function)s(%(expressions)s)::text"
+    output_field = models.TextField()
+
+    def __init__(self, **champs):
+        expressions = []
+        for cle, expression in champs.items():
+            expressions.extend([models.Value(cle), expression])
+        super().__init__(*expressions)
+
+
+def document_precalcule(nom):
+    """Renvoie l'expression du document précalculé de l'entité de la requête englobante
+
+    :param nom: le nom des entités (une clé de :py:data:`data_france.documents.ENTITES`)
+    """
+    cle = [models.Value(f"entites/{nom}")]
+    for champ in sorted(ENTITES[nom].champs_cle):
+        cle.extend([models.Value("/"), models.OuterRef(champ)])
+
+    return models.Subquery(
+        DocumentPrecalcule.objects.filter(
+            cle=Concat(*cle, output_field=models.TextField())
+        ).values("contenu")[:1],
+        output_field=models.TextField(),
+    )
+
+
+def _communes(termes):
+    return Commune.objects.search(termes), document_precalcule("communes")
+
+
+def _epci(termes):
+    return EPCI.objects.search(termes), document_precalcule("epci")
+
+
+def _departements(termes):
+    return Departement.objects.search(termes), document_precalcule("departements")
+
+
+def _regions(termes):
+    return Region.objects.search(termes), document_precalcule("regions")
+
+
+def _codes_postaux(termes):
+    mots = normaliser_texte(termes).split()
+    if len(mots) != 1 or not mots[0].isdigit() or len(mots[0]) > 5:
+        return None, None
+    return (
+        CodePostal.objects.filter(code__startswith=mots[0]).order_by("code"),
+        document_precalcule("codes-postaux"),
+    )
+
+
+def _elus_municipaux(termes):
+    document = ObjetJSON(
+        id=models.F("id"),
+        nom=models.F("nom"),
+        prenom=models.F("prenom"),
+        sexe=models.F("sexe"),
+        fonction=models.F("fonction"),
+        ordre_fonction=models.F("ordre_fonction"),
+        fonction_epci=models.F("fonction_epci"),
+        commune_code=models.F("commune__code"),
+        commune_type=models.F("commune__type"),
+        commune_nom=models.F("commune__nom"),
+        commune_type_nom=models.F("commune__type_nom"),
+    )
+    return EluMunicipal.objects.search(termes), document
+
+
+def _document_elu_municipal(valeurs):
+    """Reconstruit la sérialisation d'un élu à partir des colonnes lues par la requête"""
+    commune = Commune(
+        code=valeurs.pop("commune_code"),
+        type=valeurs.pop("commune_type"),
+        nom=valeurs.pop("commune_nom"),
+        type_nom=valeurs.pop("commune_type_nom"),
+    )
+    return EluMunicipal(commune=commune, **valeurs).as_dict()
+
+
+RECHERCHES = {
+    "communes": _communes,
+    "epci": _epci,
+    "departements": _departements,
+    "regions": _regions,
+    "codes-postaux": _codes_postaux,
+    "elus-municipaux": _elus_municipaux,
+}
+
+CONSTRUCTEURS = {"elus-municipaux": _document_elu_municipal}
+
+# champs des documents dans lesquels les termes recherchés sont surlignés
+CHAMPS_SURLIGNES = {
+    "communes": ("nom", "code"),
+    "epci": ("nom",),
+    "departements": ("nom", "code"),
+    "regions": ("nom",),
+    "codes-postaux": ("code",),
+    "elus-municipaux": ("nom", "prenom"),
+}
+
+
+def requete_recherche_globale(termes, types=TYPES_RESULTATS, limite=5):
+    """Renvoie la requête réunissant les meilleurs résultats de chaque type
+
+    :param termes: les termes recherchés
+    :param types: les types d'entités dans lesquels chercher
+    :param limite: le nombre maximal de résultats par type
+    :return: un queryset de triplets (type, identifiant, document JSON), ou `None`
+      si aucun type d'entité ne peut correspondre aux termes
+    """
+    parties = []
+    for type_resultat in types:
+        qs, document = RECHERCHES[type_resultat](termes)
+        if qs is None:
+            continue
+        parties.append(
+            qs.annotate(
+                resultat_type=models.Value(
+                    type_resultat, output_field=models.CharField()
+                ),
+                resultat_id=models.F("id"),
+                resultat_document=document,
+            ).values_list("resultat_type", "resultat_id", "resultat_document")[:limite]
+        )
+
+    if not parties:
+        return None
+    return parties[0].union(*parties[1:], all=True)
+
+
+def recherche_globale(termes, types=TYPES_RESULTATS, limite=5):
+    """Cherche les termes dans plusieurs types d'entités à la fois
+
+    Les documents des entités qui n'auraient pas été précalculés (données
+    importées avec une version antérieure de data_france) sont construits par une
+    requête supplémentaire.
+
+    :param termes: les termes recherchés
+    :param types: les types d'entités dans lesquels chercher
+    :param limite: le nombre maximal de résultats par type
+    :return: un dictionnaire associant à chaque type la liste ordonnée de ses
+      résultats sérialisés
+    """
+    resultats = {type_resultat: [] for type_resultat in types}
+
+    requete = requete_recherche_globale(termes, types, limite)
+    if requete is None:
+        return resultats
+
+    manquants = {}
+    # les sous-requêtes sont concaténées dans l'ordre, chacune triée par pertinence
+    for type_resultat, id_resultat, document in requete:
+        if document is None:
+            manquants.setdefault(type_resultat, {})[id_resultat] = len(
+                resultats[type_resultat]
+            )
+            resultats[type_resultat].append(None)
+            continue
+
+        document = json.loads(document)
+        if type_resultat in CONSTRUCTEURS:
+            document = CONSTRUCTEURS[type_resultat](document)
+        resultats[type_resultat].append(document)
+
+    for type_resultat, positions in manquants.items():
+        entites = ENTITES[type_resultat].queryset.filter(id__in=positions)
+        for entite in entites.sans_champs_lourds():
+            resultats[type_resultat][positions[entite.id]] = entite.as_dict()
+
+    return resultats
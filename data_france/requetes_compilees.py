@@ -0,0 +1,170 @@
+"""Cache du SQL compilé des requêtes de recherche
+
+La construction d'un queryset de recherche et surtout la compilation de son SQL
+par Django coûtent bien plus cher que l'exécution de la requête elle-même par
+PostgreSQL sur les index plein texte. Or, pour une même forme de requête (mêmes
+filtres, même limite), seul le texte recherché change d'une requête à l'autre.
+
+:py:class:`RecherchesCompilees` compile donc une fois pour toutes chaque forme de
+requête, avec des termes sentinelles, puis se contente de remplacer les
+paramètres correspondant aux termes pour chaque recherche.
+
+Avec le réglage `DATA_FRANCE_REQUETES_PREPAREES`, les requêtes compilées sont de
+plus préparées côté serveur (`PREPARE`) sur chaque connexion, ce qui évite à
+PostgreSQL d'analyser et de planifier à nouveau la requête. Ce réglage est
+incompatible avec les gestionnaires de connexions en mode transaction (comme
+PgBouncer), qui ne conservent pas les requêtes préparées d'une transaction à
+l'autre.
+"""
+import copy
+import hashlib
+import re
+from functools import lru_cache
+from itertools import count
+
+from django.conf import settings
+from django.db import connections
+from django.db.backends.signals import connection_created
+from django.dispatch import receiver
+
+from data_france.search import prefixe_code, requete_prefixe
+
+# termes utilisés pour compiler les requêtes, selon qu'il s'agit ou non d'un
+# préfixe court (voir SearchQueryset.search), et d'un début de code (voir
+# CommuneQueryset.search)
+SENTINELLE_COURTE = "zqx"
+SENTINELLE_LONGUE = "zqxsentinelle"
+SENTINELLE_CODE_COURTE = "999"
+SENTINELLE_CODE_LONGUE = "99999"
+
+RE_PARAMETRE = re.compile(r"%([%s])")
+
+
+@receiver(connection_created)
+def _oublier_requetes_preparees(sender, connection, **kwargs):
+    connection.data_france_requetes_preparees = set()
+
+
+def _preparer(connection, sql):
+    """Prépare une requête sur la connexion, si ce n'est pas déjà fait
+
+    :return: le nom de la requête préparée
+    """
+    nom = f"data_france_{hashlib.sha1(sql.encode()).hexdigest()[:16]}"
+
+    preparees = getattr(connection, "data_france_requetes_preparees", None)
+    if preparees is None:
+        preparees = connection.data_france_requetes_preparees = set()
+
+    if nom not in preparees:
+        numeros = count(1)
+        sql_preparee = RE_PARAMETRE.sub(
+            lambda m: "%" if m.group(1) == "%" else f"${next(numeros)}", sql
+        )
+        with connection.cursor() as cursor:
+            cursor.execute(f"PREPARE {nom} AS {sql_preparee}")
+        preparees.add(nom)
+
+    return nom
+
+
+def _motif_prefixe_code(termes):
+    """Renvoie le motif `LIKE` de la recherche par début de code"""
+    return f"{prefixe_code(termes)}%"
+
+
+class RecherchesCompilees:
+    """Cache des requêtes de recherche compilées, par forme de requête
+
+    :param model: le modèle recherché, dont le manager est un
+      :py:class:`~data_france.models.SearchQueryset`
+    :param construire: une fonction qui renvoie le queryset de recherche à partir
+      des termes recherchés et des paramètres de forme ; les termes ne doivent
+      être utilisés que par :py:meth:`SearchQueryset.search`
+    :param taille: le nombre maximal de formes de requêtes gardées en cache
+    """
+
+    def __init__(self, model, construire, taille=128):
+        self.model = model
+        self.construire = construire
+        # le SQL compilé ne dépend pas de la version des données
+        self._compiler = lru_cache(maxsize=taille)(self._compiler)
+
+    def _compiler(self, sentinelle, forme, using):
+        qs = self.construire(sentinelle, *forme).using(using)
+        compilateur = qs.query.get_compiler(using=qs.db)
+        sql, params = compilateur.as_sql()
+
+        # paramètres à remplacer, avec la fonction qui calcule leur valeur à partir
+        # des termes recherchés
+        remplacements = {}
+        requete = requete_prefixe(sentinelle)
+        for i, p in enumerate(params):
+            if p == requete:
+                remplacements[i] = requete_prefixe
+            elif p == sentinelle:
+                remplacements[i] = str
+            elif p == f"{sentinelle}%":
+                remplacements[i] = _motif_prefixe_code
+
+        return qs, compilateur, sql, tuple(params), remplacements
+
+    def sql(self, termes, *forme, using=None):
+        """Renvoie le SQL et les paramètres de la recherche
+
+        :param termes: les termes recherchés
+        :param forme: les autres paramètres de la recherche, qui doivent pouvoir
+          servir de clé de dictionnaire
+        :param using: l'alias de la base de données
+        :return: un quadruplet (queryset compilé, compilateur, SQL, paramètres)
+        """
+        court = self.model._default_manager.all()._prefixe_court(termes)
+        if prefixe_code(termes) is not None:
+            sentinelle = SENTINELLE_CODE_COURTE if court else SENTINELLE_CODE_LONGUE
+        else:
+            sentinelle = SENTINELLE_COURTE if court else SENTINELLE_LONGUE
+
+        qs, compilateur, sql, params, remplacements = self._compiler(
+            sentinelle, forme, using
+        )
+
+        params = [
+            remplacements[i](termes) if i in remplacements else p
+            for i, p in enumerate(params)
+        ]
+        return qs, compilateur, sql, params
+
+    def evaluer(self, termes, *forme, using=None):
+        """Exécute la recherche et renvoie le queryset évalué
+
+        Le queryset renvoyé a déjà chargé ses résultats : il peut être parcouru,
+        découpé (le découpage s'applique alors à la liste des résultats) ou
+        utilisé avec :py:meth:`~data_france.models.DataFranceQueryset.cle`.
+
+        :param termes: les termes recherchés
+        :param forme: les autres paramètres de la recherche (voir :py:meth:`sql`)
+        :param using: l'alias de la base de données
+        """
+        qs, compilateur, sql, params = self.sql(termes, *forme, using=using)
+        # les connexions sont propres à chaque thread : celle du thread qui a
+        # compilé la requête ne doit pas être réutilisée
+        connection = connections[qs.db]
+
+        if getattr(settings, "DATA_FRANCE_REQUETES_PREPAREES", False):
+            nom = _preparer(connection, sql)
+            sql = f"EXECUTE {nom}({', '.join(['%s'] * len(params))})"
+
+        # le compilateur, déjà configuré lors de la première compilation, est
+        # réutilisé sans recompiler la requête
+        compilateur = copy.copy(compilateur)
+        compilateur.connection = connection
+        compilateur.as_sql = lambda *args, **kwargs: (sql, params)
+
+        qs = qs._chain()
+        qs.query.get_compiler = lambda *args, **kwargs: compilateur
+        try:
+            qs._fetch_all()
+        finally:
+            del qs.query.get_compiler
+
+        return qs
@@ -1,9 +1,26 @@
 import re
+import unicodedata
+from functools import lru_cache
 
 from django.contrib.postgres.search import SearchQuery
+from django.db.models import BooleanField, Func, TextField
 
-# taken from django-watson: https://github.com/etianen/django-watson/blob/2226de139b6e177bfbe2824b1749478dbcce3318/watson/backends.py#L26
-RE_POSTGRES_ESCAPE_CHARS = re.compile(r"[&:(|)!><'-]", re.UNICODE)
+RE_NON_ALPHANUMERIQUE = re.compile(r"[^a-z0-9]+")
+
+# lettres que la décomposition unicode ne sépare pas, mais que unaccent remplace
+LETTRES_SANS_DECOMPOSITION = str.maketrans(
+    {
+        "œ": "oe",
+        "æ": "ae",
+        "ß": "ss",
+        "ø": "o",
+        "đ": "d",
+        "ð": "d",
+        "ł": "l",
+        "þ": "th",
+        "ı": "i",
+    }
+)
 
 # inspired from django-watson:
 # https://github.com/etianen/django-watson/blob/2226de139b6e177bfbe2824b1749478dbcce3318/watson/backends.py#L33
@@ -22,18 +39,161 @@ class PrefixSearchQuery(SearchQuery):
         normalizes the query text to a format that can be consumed
         by the backend database
         """
-        text = RE_POSTGRES_ESCAPE_CHARS.sub(
-            " ", text
-        ).strip()  # Replace harmful characters with space.
+        return requete_prefixe(text)
+
+
+@lru_cache(maxsize=1024)
+def requete_prefixe(text):
+    """Convertit un texte recherché en tsquery brute, le dernier mot étant un préfixe
+
+    Le texte est normalisé par :py:func:`normaliser_texte`, comme les champs
+    indexés par la fonction SQL `data_france_vecteur_recherche` : les mots
+    transmis à PostgreSQL sont ainsi découpés de la même façon que ceux des
+    vecteurs de recherche (notamment pour les mots composés et les apostrophes),
+    et ne contiennent aucun caractère spécial pour `to_tsquery`.
+
+    Le résultat est mis en cache : les mêmes termes (notamment les préfixes
+    successifs d'une autocomplétion) sont souvent recherchés à nouveau.
+    """
+    words = normaliser_texte(text).split()
+
+    if not words:
+        return ""
+
+    # qualifying a term with :* means searching it as a prefix
+    words[-1] = f"{words[-1]}:*"
+    return " & ".join(words)
+
+
+class Normaliser(Func):
+    """Normalise un texte pour la recherche approchée par trigrammes
+
+    Utilise la fonction SQL `data_france_normaliser` (minuscules, sans accents ni
+    ponctuation). Plusieurs expressions sont concaténées, séparées par une espace,
+    comme dans les index par trigrammes.
+    """
+
+    function = "data_france_normaliser"
+    arg_joiner = " || ' ' || "
+    output_field = TextField()
+
+
+class TrigrammesSimilaires(Func):
+    """Teste la similarité par trigrammes de deux textes (opérateur `%` de pg_trgm)
+
+    Équivalent au lookup `trigram_similar`, qui n'est disponible que si
+    `django.contrib.postgres` fait partie des applications installées.
+    """
+
+    template = "(%(expressions)s)"
+    arg_joiner = " %% "
+    output_field = BooleanField()
+
+
+def normaliser_texte(texte):
+    """Normalise un texte comme la fonction SQL `data_france_normaliser`
+
+    Le texte est mis en minuscules, débarrassé de ses accents, et tous les
+    caractères autres que lettres et chiffres sont remplacés par des espaces.
+
+    C'est la normalisation commune à toutes les recherches : celle des termes
+    des requêtes plein texte (:py:func:`requete_prefixe`), des champs indexés
+    dans les vecteurs de recherche (fonction SQL `data_france_vecteur_recherche`),
+    de la recherche approchée et du moteur d'autocomplétion en mémoire.
+
+    :param texte: le texte à normaliser
+    :return: le texte normalisé
+    """
+    return RE_NON_ALPHANUMERIQUE.sub(" ", _sans_accents(texte)).strip()
+
+
+def _sans_accents(texte):
+    """Met un texte en minuscules et le débarrasse de ses accents et ligatures"""
+    texte = unicodedata.normalize(
+        "NFKD", texte.lower().translate(LETTRES_SANS_DECOMPOSITION)
+    )
+    return "".join(c for c in texte if not unicodedata.combining(c))
+
+
+@lru_cache(maxsize=4096)
+def _caractere_normalise(caractere):
+    """Renvoie la forme normalisée d'un caractère, ou `None` s'il sépare des mots
+
+    La forme normalisée est vide pour les diacritiques combinants, qui ne
+    séparent pas les mots.
+    """
+    normalise = _sans_accents(caractere)
+    if normalise and RE_NON_ALPHANUMERIQUE.fullmatch(normalise):
+        return None
+    return normalise
+
+
+def _mots_avec_positions(texte):
+    """Découpe un texte en mots normalisés, avec la position d'origine de chaque caractère
+
+    Le découpage est le même que celui de :py:func:`normaliser_texte`.
+
+    :return: la liste des couples (mot normalisé, positions dans le texte des
+      caractères du mot normalisé)
+    """
+    mots = []
+    mot, positions = [], []
+    for i, caractere in enumerate(texte):
+        normalise = _caractere_normalise(caractere)
+        if normalise is None:
+            if mot:
+                mots.append(("".join(mot), positions))
+                mot, positions = [], []
+            continue
+        if normalise:
+            mot.append(normalise)
+            positions.extend([i] * len(normalise))
+    if mot:
+        mots.append(("".join(mot), positions))
+    return mots
+
+
+def surligner(termes, textes):
+    """Renvoie les positions des correspondances avec les termes recherchés dans chaque texte
+
+    Termes et textes sont découpés en mots normalisés comme par
+    :py:func:`normaliser_texte`, c'est-à-dire comme pour la recherche elle-même.
+    Chaque mot d'un texte qui commence par l'un des mots recherchés est surligné
+    sur la longueur du plus long d'entre eux. Les termes ne sont normalisés
+    qu'une fois pour tous les textes.
+
+    :param termes: les termes recherchés
+    :param textes: les textes à surligner
+    :return: pour chaque texte, la liste des intervalles `[début, fin)`, en
+      caractères du texte d'origine, des parties correspondant aux termes
+    """
+    recherches = sorted(set(normaliser_texte(termes).split()), key=len, reverse=True)
 
-        if not text:
-            return ""
+    resultats = []
+    for texte in textes:
+        intervalles = []
+        texte = texte or ""
+        for mot, positions in _mots_avec_positions(texte):
+            for recherche in recherches:
+                if mot.startswith(recherche):
+                    fin = positions[len(recherche) - 1] + 1
+                    # diacritiques combinants du dernier caractère surligné
+                    while fin < len(texte) and _caractere_normalise(texte[fin]) == "":
+                        fin += 1
+                    intervalles.append([positions[0], fin])
+                    break
+        resultats.append(intervalles)
+    return resultats
 
-        words = ["$${0}$$".format(word) for word in text.split()]
 
-        if not words:
-            return ""
+def prefixe_code(texte):
+    """Renvoie le début de code postal ou de code INSEE formé par le texte, le cas échéant
 
-        # qualifying a term with :* means searching it as a prefix
-        words[-1] = f"{words[-1]}:*"
-        return " & ".join(words)
+    :param texte: le texte recherché
+    :return: les chiffres recherchés si le texte est un unique nombre d'au plus
+      cinq chiffres, `None` sinon
+    """
+    mots = normaliser_texte(texte).split()
+    if len(mots) == 1 and mots[0].isdigit() and len(mots[0]) <= 5:
+        return mots[0]
+    return None
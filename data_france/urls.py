@@ -4,6 +4,7 @@ from data_france import views
 
 app_name = "data_france"
 urlpatterns = [
+    path("chercher/", views.RechercheGlobaleView.as_view(), name="chercher"),
     path(
         "communes/chercher/",
         views.RechercheCommuneView.as_view(),
@@ -38,9 +39,127 @@ urlpatterns = [
         views.CollectiviteRegionaleParCodeView.as_view(),
         name="collectivite-regionale-par-code",
     ),
+    path(
+        "departements/", views.DepartementListeView.as_view(), name="departements-liste"
+    ),
+    path("regions/", views.RegionListeView.as_view(), name="regions-liste"),
+    path(
+        "collectivites-departementales/",
+        views.CollectiviteDepartementaleListeView.as_view(),
+        name="collectivites-departementales-liste",
+    ),
+    path(
+        "collectivites-regionales/",
+        views.CollectiviteRegionaleListeView.as_view(),
+        name="collectivites-regionales-liste",
+    ),
+    path("epci/", views.EPCIListeView.as_view(), name="epci-liste"),
+    path("localiser/", views.LocaliserView.as_view(), name="localiser"),
+    path("localiser/lot/", views.LocaliserLotView.as_view(), name="localiser-lot"),
     path(
         "circonscription-consulaire/chercher/",
         views.RechercheCirconscriptionConsulaireView.as_view(),
         name="circonscriptions-consulaires-par-code",
     ),
+    path(
+        "elus-municipaux/chercher/",
+        views.RechercheEluMunicipalView.as_view(),
+        name="elus-municipaux-chercher",
+    ),
+    path(
+        "elus-municipaux/",
+        views.EluMunicipalListeView.as_view(),
+        name="elus-municipaux-liste",
+    ),
+    path(
+        "elus-departementaux/",
+        views.EluDepartementalListeView.as_view(),
+        name="elus-departementaux-liste",
+    ),
+    path(
+        "elus-regionaux/",
+        views.EluRegionalListeView.as_view(),
+        name="elus-regionaux-liste",
+    ),
+    path("deputes/", views.DeputeListeView.as_view(), name="deputes-liste"),
+    path(
+        "deputes-europeens/",
+        views.DeputeEuropeenListeView.as_view(),
+        name="deputes-europeens-liste",
+    ),
+    path(
+        "exporter/communes/",
+        views.CommuneExportView.as_view(),
+        name="communes-exporter",
+    ),
+    path(
+        "exporter/epci/",
+        views.EPCIExportView.as_view(),
+        name="epci-exporter",
+    ),
+    path(
+        "exporter/cantons/",
+        views.CantonExportView.as_view(),
+        name="cantons-exporter",
+    ),
+    path(
+        "exporter/departements/",
+        views.DepartementExportView.as_view(),
+        name="departements-exporter",
+    ),
+    path(
+        "exporter/regions/",
+        views.RegionExportView.as_view(),
+        name="regions-exporter",
+    ),
+    path(
+        "exporter/codes-postaux/",
+        views.CodePostalExportView.as_view(),
+        name="codes-postaux-exporter",
+    ),
+    path(
+        "exporter/collectivites-departementales/",
+        views.CollectiviteDepartementaleExportView.as_view(),
+        name="collectivites-departementales-exporter",
+    ),
+    path(
+        "exporter/collectivites-regionales/",
+        views.CollectiviteRegionaleExportView.as_view(),
+        name="collectivites-regionales-exporter",
+    ),
+    path(
+        "exporter/circonscriptions-legislatives/",
+        views.CirconscriptionLegislativeExportView.as_view(),
+        name="circonscriptions-legislatives-exporter",
+    ),
+    path(
+        "exporter/circonscriptions-consulaires/",
+        views.CirconscriptionConsulaireExportView.as_view(),
+        name="circonscriptions-consulaires-exporter",
+    ),
+    path(
+        "exporter/deputes/",
+        views.DeputeExportView.as_view(),
+        name="deputes-exporter",
+    ),
+    path(
+        "exporter/elus-municipaux/",
+        views.EluMunicipalExportView.as_view(),
+        name="elus-municipaux-exporter",
+    ),
+    path(
+        "exporter/elus-departementaux/",
+        views.EluDepartementalExportView.as_view(),
+        name="elus-departementaux-exporter",
+    ),
+    path(
+        "exporter/elus-regionaux/",
+        views.EluRegionalExportView.as_view(),
+        name="elus-regionaux-exporter",
+    ),
+    path(
+        "exporter/deputes-europeens/",
+        views.DeputeEuropeenExportView.as_view(),
+        name="deputes-europeens-exporter",
+    ),
 ]
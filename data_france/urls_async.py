@@ -0,0 +1,19 @@
+"""Routes de data_france servies par des vues asynchrones
+
+À inclure à la place de `data_france.urls` dans un projet déployé sous ASGI. Les
+exports restent servis par leurs vues synchrones (voir
+:py:func:`data_france.asynchrone.vue_asynchrone`).
+"""
+from django.urls import path
+
+from data_france import urls
+from data_france.asynchrone import vue_asynchrone
+from data_france.views import BaseExportView
+
+app_name = "data_france"
+urlpatterns = [
+    p
+    if issubclass(p.callback.view_class, BaseExportView)
+    else path(str(p.pattern), vue_asynchrone(p.callback), name=p.name)
+    for p in urls.urlpatterns
+]
@@ -1,14 +1,45 @@
+import csv
 import json
+from itertools import chain
 
-from django.http import JsonResponse
+from django.core.exceptions import ValidationError
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db.models import Prefetch
+from django.http import Http404, HttpResponse, StreamingHttpResponse
 from django.shortcuts import get_object_or_404
+from django.utils.cache import patch_vary_headers
+from django.utils.decorators import method_decorator
 from django.views import View
+from django.views.decorators.csrf import csrf_exempt
+
+from data_france.autocompletion import autocompletion
+from data_france.cache import VersionCacheMixin, cache_par_code
 
 from data_france.forms import (
     CommuneParametresForm,
     ParCodeParametresForm,
     CommuneParCodeParametresForm,
+    ExportParametresForm,
+    ListeEntitesParametresForm,
+    LocaliserParametresForm,
+    PaginationParametresForm,
+    RechercheParametresForm,
+    RechercheGlobaleParametresForm,
+    encoder_curseur,
+    erreurs_formulaire,
+    parseur,
+)
+from data_france.documents import document_entite, document_liste
+from data_france.formats import (
+    FORMAT_JSON,
+    format_reponse,
+    repondre,
+    repondre_document,
 )
+from data_france.geo import localiser
+from data_france.recherche_globale import CHAMPS_SURLIGNES, recherche_globale
+from data_france.requetes_compilees import RecherchesCompilees
+from data_france.search import surligner
 from data_france.models import (
     Commune,
     CirconscriptionConsulaire,
@@ -18,64 +49,352 @@ from data_france.models import (
     CodePostal,
     CollectiviteDepartementale,
     CollectiviteRegionale,
+    Canton,
+    CirconscriptionLegislative,
+    Depute,
+    EluMunicipal,
+    EluDepartemental,
+    EluRegional,
+    DeputeEuropeen,
 )
 
 
-class RechercheCommuneView(View):
+def filtrer(qs, filtres, parametres):
+    """Filtre un queryset selon les paramètres GET de filtrage présents
+
+    :param qs: le queryset à filtrer
+    :param filtres: la correspondance entre noms des paramètres et chemins ORM
+    :param parametres: les paramètres GET de la requête
+    :return: le queryset filtré
+    """
+    for filtre, lookup in filtres.items():
+        valeurs = parametres.getlist(filtre)
+        if valeurs:
+            qs = qs.filter(**{f"{lookup}__in": valeurs})
+    return qs
+
+
+MESSAGE_CURSEUR_INVALIDE = "Curseur de pagination invalide."
+
+
+def reponse_curseur_invalide(request):
+    """Renvoie la réponse d'erreur à une requête dont le curseur `apres` est invalide"""
+    return repondre(
+        request, {"errors": {"apres": [MESSAGE_CURSEUR_INVALIDE]}}, status=400
+    )
+
+
+def paginer(qs, params):
+    """Renvoie une page de résultats de recherche, et le curseur de la page suivante
+
+    Un curseur bien formé mais qui ne correspond pas à l'ordre du queryset lève
+    une :py:class:`ValidationError`, à laquelle les vues répondent par
+    :py:func:`reponse_curseur_invalide`.
+
+    :param qs: le queryset, explicitement ordonné (voir :py:meth:`DataFranceQueryset.apres`)
+    :param params: les paramètres de pagination validés (`limit` et `apres`)
+    :return: un couple (liste des résultats, curseur de la page suivante ou `None`)
+    """
+    limite = params["limit"]
+    if params["apres"]:
+        try:
+            qs = qs.apres(*params["apres"])
+        except (ValueError, TypeError):
+            raise ValidationError(MESSAGE_CURSEUR_INVALIDE, code="invalid")
+
+    resultats = list(qs[: limite + 1])
+    if len(resultats) > limite:
+        resultats = resultats[:limite]
+        return resultats, encoder_curseur(qs.cle(resultats[-1]))
+    return resultats, None
+
+
+def surligner_resultats(termes, resultats, champs):
+    """Ajoute aux résultats sérialisés les positions des termes recherchés dans certains champs
+
+    Les positions sont calculées en une fois pour toute la page de résultats (voir
+    :py:func:`data_france.search.surligner`), sous la clé `highlight`. Les
+    résultats d'origine, qui peuvent être partagés (documents du moteur
+    d'autocomplétion notamment), ne sont pas modifiés.
+
+    :param termes: les termes recherchés
+    :param resultats: la liste des résultats sérialisés
+    :param champs: les champs à surligner
+    :return: la liste des résultats complétés
+    """
+    positions = {
+        champ: surligner(termes, [r.get(champ) for r in resultats]) for champ in champs
+    }
+    return [
+        {**r, "highlight": {champ: positions[champ][i] for champ in champs}}
+        for i, r in enumerate(resultats)
+    ]
+
+
+def requete_recherche_communes(q, types, geojson, approchee, limite=None):
+    """Construit le queryset de la recherche de communes
+
+    :param limite: le nombre maximal de communes à renvoyer, s'il faut limiter
+      la requête
+    """
+    # le filtre doit précéder la recherche, pour que le seuil de la recherche
+    # approchée porte sur les seules communes des types demandés
+    qs = (
+        Commune.objects.filter(type__in=types)
+        .search(q, geometrie=geojson, approchee=approchee)
+        .select_related("departement", "commune_parent__departement")
+        .sans_champs_lourds(*(["geometry"] if geojson else []))
+    )
+    if limite is not None:
+        qs = qs[:limite]
+    return qs
+
+
+recherches_communes = RecherchesCompilees(Commune, requete_recherche_communes)
+
+
+class RechercheCommuneView(VersionCacheMixin, View):
+    champs_surlignes = ("nom", "code")
+
     def get(self, request, *args, **kwargs):
-        params = CommuneParametresForm(data=request.GET)
+        params, erreurs = parseur(CommuneParametresForm).valider(request.GET)
 
-        if params.is_valid():
-            q = params.cleaned_data["q"]
-            types = params.cleaned_data.get("type") or [
-                t for t, _ in Commune.TypeCommune.choices
-            ]
+        if not erreurs:
+            q = params["q"]
+            types = params.get("type") or [t for t, _ in Commune.TypeCommune.choices]
 
-            geojson = params.cleaned_data["geojson"]
+            geojson = params["geojson"]
 
-            qs = (
-                Commune.objects.search(q)
-                .filter(type__in=types)
-                .select_related("departement", "commune_parent__departement")[:10]
-            )
+            moteur = autocompletion()
+            if moteur is not None and not geojson and not params["approchee"]:
+                return self.chercher_en_memoire(moteur, q, types, params)
+
+            if params["apres"] is None:
+                # première page : la requête n'est compilée qu'une fois par forme
+                qs = recherches_communes.evaluer(
+                    q, tuple(types), geojson, params["approchee"], params["limit"] + 1
+                )
+            else:
+                qs = requete_recherche_communes(q, types, geojson, params["approchee"])
+            try:
+                qs, suivant = paginer(qs, params)
+            except ValidationError:
+                return reponse_curseur_invalide(request)
+            pagination = {"suivant": suivant} if suivant else {}
 
             res = [c.as_dict() for c in qs]
+            if params["highlight"]:
+                res = surligner_resultats(q, res, self.champs_surlignes)
 
             if geojson:
                 features = [
                     {
                         "type": "Feature",
                         "properties": r,
-                        "geometry": json.loads(c.geometry.geojson),
+                        "geometry": c.geometry,
                     }
                     for r, c in zip(res, qs)
                 ]
-                return JsonResponse({"type": "FeatureCollection", "features": features})
+                return repondre(
+                    request,
+                    {"type": "FeatureCollection", "features": features, **pagination},
+                )
             else:
-                return JsonResponse({"results": res})
+                return repondre(request, {"results": res, **pagination})
 
-        return JsonResponse({"errors": params.errors}, status=400)
+        return repondre(request, {"errors": erreurs}, status=400)
 
+    def chercher_en_memoire(self, moteur, q, types, params):
+        """Répond à la recherche avec le moteur d'autocomplétion en mémoire"""
+        try:
+            resultats, suivant = moteur.chercher(
+                q, types=types, limite=params["limit"], apres=params["apres"]
+            )
+        except ValueError:
+            return reponse_curseur_invalide(self.request)
+
+        if params["highlight"]:
+            resultats = surligner_resultats(q, resultats, self.champs_surlignes)
+
+        pagination = {"suivant": encoder_curseur(suivant)} if suivant else {}
+        return repondre(self.request, {"results": resultats, **pagination})
+
+
+class RechercheGlobaleView(VersionCacheMixin, View):
+    """Cherche simultanément communes, EPCI, départements, régions, codes postaux et élus
+
+    Les `limit` meilleurs résultats de chaque type sont renvoyés, regroupés par
+    type (voir :py:func:`data_france.recherche_globale.recherche_globale`).
+    """
+
+    def get(self, request, *args, **kwargs):
+        params, erreurs = parseur(RechercheGlobaleParametresForm).valider(request.GET)
+
+        if erreurs:
+            return repondre(request, {"errors": erreurs}, status=400)
 
-class RechercheCirconscriptionConsulaireView(View):
+        resultats = recherche_globale(
+            params["q"], types=params["types"], limite=params["limit"]
+        )
+        if params["highlight"]:
+            resultats = {
+                type_resultat: surligner_resultats(
+                    params["q"], documents, CHAMPS_SURLIGNES[type_resultat]
+                )
+                for type_resultat, documents in resultats.items()
+            }
+
+        return repondre(request, {"results": resultats})
+
+
+class RechercheCirconscriptionConsulaireView(VersionCacheMixin, View):
     def get(self, request, *args, **kwargs):
         q = request.GET.get("q")
 
         if not q:
-            return JsonResponse(
-                {"errors": ["Paramètre de recherche `q' manquant"]}, status=400
+            return repondre(
+                request, {"errors": ["Paramètre de recherche `q' manquant"]}, status=400
             )
 
-        qs = CirconscriptionConsulaire.objects.search(q)
+        params = PaginationParametresForm(data=request.GET)
+        if not params.is_valid():
+            return repondre(request, {"errors": erreurs_formulaire(params)}, status=400)
+
+        try:
+            qs, suivant = paginer(
+                CirconscriptionConsulaire.objects.search(q), params.cleaned_data
+            )
+        except ValidationError:
+            return reponse_curseur_invalide(request)
+        pagination = {"suivant": suivant} if suivant else {}
 
         res = [c.as_dict() for c in qs]
 
-        return JsonResponse({"results": res})
+        return repondre(request, {"results": res, **pagination})
+
+
+class RechercheEluMunicipalView(VersionCacheMixin, View):
+    # seules les colonnes nécessaires à la sérialisation sont lues, ce qui évite
+    # notamment de charger les géométries des communes
+    champs = (
+        "nom",
+        "prenom",
+        "sexe",
+        "fonction",
+        "ordre_fonction",
+        "fonction_epci",
+        "commune__code",
+        "commune__type",
+        "commune__nom",
+        "commune__type_nom",
+    )
+    filtres = {
+        "commune": "commune__code",
+        "departement": "commune__departement__code",
+        "fonction": "fonction",
+    }
+    champs_surlignes = ("nom", "prenom")
+
+    def get(self, request, *args, **kwargs):
+        params, erreurs = parseur(RechercheParametresForm).valider(request.GET)
 
+        if erreurs:
+            return repondre(request, {"errors": erreurs}, status=400)
 
-class BaseParCodeView(View):
+        # filtrage préalable à la recherche, pour que le seuil de la recherche
+        # approchée porte sur les seul·es élu·es filtré·es
+        qs = (
+            filtrer(EluMunicipal.objects.all(), self.filtres, request.GET)
+            .search(params["q"], approchee=params["approchee"])
+            .select_related("commune")
+            .only(*self.champs)
+        )
+
+        try:
+            resultats, suivant = paginer(qs, params)
+        except ValidationError:
+            return reponse_curseur_invalide(request)
+        pagination = {"suivant": suivant} if suivant else {}
+
+        res = [e.as_dict() for e in resultats]
+        if params["highlight"]:
+            res = surligner_resultats(params["q"], res, self.champs_surlignes)
+
+        return repondre(request, {"results": res, **pagination})
+
+
+class LocaliserView(VersionCacheMixin, View):
+    """Renvoie la chaîne administrative contenant un point donné"""
+
+    def get(self, request, *args, **kwargs):
+        params = LocaliserParametresForm(data=request.GET)
+
+        if not params.is_valid():
+            return repondre(request, {"errors": erreurs_formulaire(params)}, status=400)
+
+        (resultat,) = localiser(
+            [(params.cleaned_data["lat"], params.cleaned_data["lon"])]
+        )
+
+        if resultat is None:
+            raise Http404("Ce point n'est situé dans aucune commune.")
+
+        return repondre(request, resultat)
+
+
+@method_decorator(csrf_exempt, name="dispatch")
+class LocaliserLotView(View):
+    """Renvoie la chaîne administrative de chacun des points d'une liste
+
+    Les points sont transmis dans le corps d'une requête POST, sous la forme
+    d'un objet JSON `{"points": [[lat, lon], ...]}`. Les erreurs de validation
+    des points sont renvoyées par position du point dans la liste.
+    """
+
+    max_points = 1000
+
+    def post(self, request, *args, **kwargs):
+        try:
+            points = json.loads(request.body)["points"]
+            points = [(float(lat), float(lon)) for lat, lon in points]
+        except (ValueError, KeyError, TypeError):
+            return repondre(
+                request,
+                {"errors": {"points": ["Liste de couples [lat, lon] attendue."]}},
+                status=400,
+            )
+
+        if len(points) > self.max_points:
+            return repondre(
+                request,
+                {
+                    "errors": {
+                        "points": [
+                            f"Au plus {self.max_points} points peuvent être localisés à la fois."
+                        ]
+                    }
+                },
+                status=400,
+            )
+
+        # mêmes contrôles (valeurs finies et dans les bornes) que pour un point seul
+        valider = parseur(LocaliserParametresForm).valider
+        erreurs = {}
+        for i, (lat, lon) in enumerate(points):
+            _, erreurs_point = valider({"lat": lat, "lon": lon})
+            if erreurs_point:
+                erreurs[str(i)] = erreurs_point
+        if erreurs:
+            return repondre(request, {"errors": {"points": erreurs}}, status=400)
+
+        return repondre(request, {"results": localiser(points)})
+
+
+class BaseParCodeView(VersionCacheMixin, View):
     queryset = None
     form_class = ParCodeParametresForm
+    # nom des documents précalculés des entités (voir data_france.documents)
+    documents = None
 
     def get_props_from_instance(self, instance):
         return instance.as_dict()
@@ -84,29 +403,90 @@ class BaseParCodeView(View):
         return self.queryset.all()
 
     def get(self, request, *args, **kwargs):
-        params = self.form_class(data=request.GET)
-
-        if not params.is_valid():
-            return JsonResponse({"errors": params.errors}, status=400)
-
-        geojson = params.cleaned_data.get("geojson", False)
-        other_params = {k: v for k, v in params.cleaned_data.items() if k != "geojson"}
-
-        qs = self.get_queryset()
+        params, erreurs = parseur(self.form_class).valider(request.GET)
+
+        if erreurs:
+            return repondre(request, {"errors": erreurs}, status=400)
+
+        cache = cache_par_code()
+        if cache is None:
+            return self.get_response(params)
+
+        cle = (
+            self.__class__,
+            format_reponse(request),
+            bool(request.GET.get("wkb")),
+            *sorted(params.items()),
+        )
+        entree = cache.get(cle)
+        if entree is not None:
+            contenu, content_type = entree
+            response = HttpResponse(contenu, content_type=content_type)
+            patch_vary_headers(response, ["Accept"])
+            return response
+
+        response = self.get_response(params)
+        if response.status_code == 200:
+            cache.set(cle, (response.content, response["Content-Type"]))
+        return response
+
+    def get_response(self, cleaned_data):
+        geojson = cleaned_data.get("geojson", False)
+        other_params = {k: v for k, v in cleaned_data.items() if k != "geojson"}
+
+        if self.documents is not None:
+            response = self.get_response_document(other_params, geojson)
+            if response is not None:
+                return response
+
+        qs = self.get_queryset().sans_champs_lourds(*(["geometry"] if geojson else []))
 
         instance = get_object_or_404(qs, **other_params)
         props = self.get_props_from_instance(instance)
 
         if geojson:
-            return JsonResponse(
+            return repondre(
+                self.request,
                 {
                     "type": "Feature",
                     "properties": props,
-                    "geometry": json.loads(instance.geometry.geojson),
-                }
+                    "geometry": instance.geometry,
+                },
             )
         else:
-            return JsonResponse(props)
+            return repondre(self.request, props)
+
+    def get_response_document(self, params, geojson):
+        """Renvoie la réponse construite à partir du document précalculé de l'entité
+
+        En GeoJSON, la géométrie est lue séparément et insérée telle quelle dans
+        le document, sans repasser par le sérialiseur JSON.
+
+        :return: la réponse, ou `None` si le document n'existe pas
+        """
+        # en msgpack, la géométrie peut être demandée au format WKB
+        if geojson and format_reponse(self.request) != FORMAT_JSON:
+            return None
+
+        props = document_entite(self.documents, params)
+        if props is None:
+            return None
+
+        if not geojson:
+            return repondre_document(self.request, props)
+
+        geometrie = (
+            self.get_queryset()
+            .filter(**params)
+            .values_list("geometry", flat=True)
+            .first()
+        )
+        geometrie = geometrie.geojson if geometrie is not None else "null"
+
+        return repondre_document(
+            self.request,
+            f'{{"type": "Feature", "properties": {props}, "geometry": {geometrie}}}',
+        )
 
 
 class CommuneParCodeView(BaseParCodeView):
@@ -114,27 +494,444 @@ class CommuneParCodeView(BaseParCodeView):
         "departement", "commune_parent__departement"
     )
     form_class = CommuneParCodeParametresForm
+    documents = "communes"
 
 
 class EPCIParCodeView(BaseParCodeView):
-    queryset = EPCI.objects.prefetch_related("communes")
+    # seuls les codes et noms des communes sont sérialisés : on évite de charger
+    # leurs géométries et les informations sur les mairies
+    queryset = EPCI.objects.prefetch_related(
+        Prefetch("communes", queryset=Commune.objects.only("epci_id", "code", "nom"))
+    )
+    documents = "epci"
 
 
 class DepartementParCodeView(BaseParCodeView):
     queryset = Departement.objects.select_related("chef_lieu")
+    documents = "departements"
 
 
 class RegionParCodeView(BaseParCodeView):
     queryset = Region.objects.select_related("chef_lieu")
+    documents = "regions"
 
 
 class CodePostalParCodeView(BaseParCodeView):
-    queryset = CodePostal.objects.prefetch_related("communes")
+    queryset = CodePostal.objects.prefetch_related(
+        Prefetch("communes", queryset=Commune.objects.only("code", "nom", "type_nom"))
+    )
+    documents = "codes-postaux"
 
 
 class CollectiviteDepartementaleParCodeView(BaseParCodeView):
     queryset = CollectiviteDepartementale.objects.all()
+    documents = "collectivites-departementales"
 
 
 class CollectiviteRegionaleParCodeView(BaseParCodeView):
     queryset = CollectiviteRegionale.objects.all()
+    documents = "collectivites-regionales"
+
+
+class BaseListeEntitesView(VersionCacheMixin, View):
+    """Renvoie la liste complète d'un type d'entités, précalculée à l'import
+
+    Avec le paramètre `geojson`, la liste est renvoyée sous forme de
+    FeatureCollection, avec des géométries simplifiées.
+    """
+
+    liste = None
+
+    def get(self, request, *args, **kwargs):
+        params, erreurs = parseur(ListeEntitesParametresForm).valider(request.GET)
+
+        if erreurs:
+            return repondre(request, {"errors": erreurs}, status=400)
+
+        return repondre_document(
+            request, document_liste(self.liste, geometrie=params["geojson"])
+        )
+
+
+class DepartementListeView(BaseListeEntitesView):
+    liste = "departements"
+
+
+class RegionListeView(BaseListeEntitesView):
+    liste = "regions"
+
+
+class CollectiviteDepartementaleListeView(BaseListeEntitesView):
+    liste = "collectivites-departementales"
+
+
+class CollectiviteRegionaleListeView(BaseListeEntitesView):
+    liste = "collectivites-regionales"
+
+
+class EPCIListeView(BaseListeEntitesView):
+    liste = "epci"
+
+
+class Echo:
+    """Pseudo-buffer renvoyant directement ce qu'on lui écrit
+
+    Permet d'utiliser :py:class:`csv.writer` pour produire des lignes une à une
+    dans une réponse en streaming.
+    """
+
+    def write(self, value):
+        return value
+
+
+class BaseExportView(VersionCacheMixin, View):
+    """Vue d'export en masse d'un modèle, au format NDJSON ou CSV
+
+    La réponse est produite en streaming à partir d'un curseur côté serveur
+    (:py:meth:`QuerySet.iterator`), ce qui permet d'exporter des tables entières
+    avec une consommation mémoire constante.
+
+    Les sous-classes définissent :
+
+    * :py:attr:`queryset`, le queryset à exporter ;
+    * :py:attr:`champs`, la correspondance entre les noms des champs exportés et
+      les chemins ORM correspondants ;
+    * :py:attr:`filtres`, la correspondance entre les paramètres GET de filtrage
+      acceptés et les chemins ORM correspondants.
+    """
+
+    queryset = None
+    champs = {}
+    filtres = {}
+    nom_fichier = None
+    chunk_size = 2000
+
+    def get_queryset(self):
+        return self.queryset.all()
+
+    def get(self, request, *args, **kwargs):
+        params = ExportParametresForm(data=request.GET, champs=list(self.champs))
+
+        if not params.is_valid():
+            return repondre(request, {"errors": erreurs_formulaire(params)}, status=400)
+
+        champs = params.cleaned_data["champs"] or list(self.champs)
+        qs = self.get_queryset()
+
+        qs = filtrer(qs, self.filtres, request.GET)
+
+        lignes = qs.values_list(*(self.champs[c] for c in champs)).iterator(
+            chunk_size=self.chunk_size
+        )
+
+        if params.cleaned_data["format"] == ExportParametresForm.FORMAT_CSV:
+            writer = csv.writer(Echo())
+            contenu = chain(
+                [writer.writerow(champs)], (writer.writerow(ligne) for ligne in lignes)
+            )
+            res = StreamingHttpResponse(contenu, content_type="text/csv")
+            extension = "csv"
+        else:
+            encoder = DjangoJSONEncoder(ensure_ascii=False)
+            contenu = (
+                f"{encoder.encode(dict(zip(champs, ligne)))}\n".encode()
+                for ligne in lignes
+            )
+            res = StreamingHttpResponse(contenu, content_type="application/x-ndjson")
+            extension = "ndjson"
+
+        res[
+            "Content-Disposition"
+        ] = f'attachment; filename="{self.nom_fichier}.{extension}"'
+        return res
+
+
+class CommuneExportView(BaseExportView):
+    queryset = Commune.objects.all()
+    nom_fichier = "communes"
+    champs = {
+        "code": "code",
+        "type": "type",
+        "nom": "nom",
+        "type_nom": "type_nom",
+        "code_departement": "departement__code",
+        "code_epci": "epci__code",
+        "code_commune_parent": "commune_parent__code",
+        "population_municipale": "population_municipale",
+        "population_cap": "population_cap",
+        "mairie_adresse": "mairie_adresse",
+        "mairie_email": "mairie_email",
+        "mairie_telephone": "mairie_telephone",
+        "mairie_site": "mairie_site",
+    }
+    filtres = {
+        "type": "type",
+        "departement": "departement__code",
+        "epci": "epci__code",
+    }
+
+
+class EPCIExportView(BaseExportView):
+    queryset = EPCI.objects.all()
+    nom_fichier = "epci"
+    champs = {
+        "code": "code",
+        "type": "type",
+        "nom": "nom",
+        "population": "population",
+    }
+    filtres = {"type": "type"}
+
+
+class CantonExportView(BaseExportView):
+    queryset = Canton.objects.all()
+    nom_fichier = "cantons"
+    champs = {
+        "code": "code",
+        "type": "type",
+        "nom": "nom",
+        "type_nom": "type_nom",
+        "composition": "composition",
+        "code_departement": "departement__code",
+        "code_bureau_centralisateur": "bureau_centralisateur__code",
+    }
+    filtres = {"type": "type", "departement": "departement__code"}
+
+
+class DepartementExportView(BaseExportView):
+    queryset = Departement.objects.all()
+    nom_fichier = "departements"
+    champs = {
+        "code": "code",
+        "nom": "nom",
+        "type_nom": "type_nom",
+        "code_region": "region__code",
+        "code_chef_lieu": "chef_lieu__code",
+        "population": "population",
+    }
+    filtres = {"region": "region__code"}
+
+
+class RegionExportView(BaseExportView):
+    queryset = Region.objects.all()
+    nom_fichier = "regions"
+    champs = {
+        "code": "code",
+        "nom": "nom",
+        "type_nom": "type_nom",
+        "code_chef_lieu": "chef_lieu__code",
+        "population": "population",
+    }
+
+
+class CodePostalExportView(BaseExportView):
+    queryset = CodePostal.objects.all()
+    nom_fichier = "codes_postaux"
+    champs = {
+        "code": "code",
+        "code_commune": "communes__code",
+        "type_commune": "communes__type",
+    }
+
+
+class CollectiviteDepartementaleExportView(BaseExportView):
+    queryset = CollectiviteDepartementale.objects.all()
+    nom_fichier = "collectivites_departementales"
+    champs = {
+        "code": "code",
+        "type": "type",
+        "actif": "actif",
+        "nom": "nom",
+        "type_nom": "type_nom",
+        "code_region": "region__code",
+        "population": "population",
+    }
+    filtres = {"type": "type", "region": "region__code"}
+
+
+class CollectiviteRegionaleExportView(BaseExportView):
+    queryset = CollectiviteRegionale.objects.all()
+    nom_fichier = "collectivites_regionales"
+    champs = {
+        "code": "code",
+        "type": "type",
+        "actif": "actif",
+        "nom": "nom",
+        "type_nom": "type_nom",
+        "code_region": "region__code",
+    }
+    filtres = {"type": "type"}
+
+
+class CirconscriptionLegislativeExportView(BaseExportView):
+    queryset = CirconscriptionLegislative.objects.all()
+    nom_fichier = "circonscriptions_legislatives"
+    champs = {"code": "code", "code_departement": "departement__code"}
+    filtres = {"departement": "departement__code"}
+
+
+class CirconscriptionConsulaireExportView(BaseExportView):
+    queryset = CirconscriptionConsulaire.objects.all()
+    nom_fichier = "circonscriptions_consulaires"
+    champs = {
+        "nom": "nom",
+        "consulats": "consulats",
+        "nombre_conseillers": "nombre_conseillers",
+    }
+
+
+CHAMPS_IDENTITE = {
+    "nom": "nom",
+    "prenom": "prenom",
+    "sexe": "sexe",
+    "date_naissance": "date_naissance",
+    "profession": "profession",
+}
+
+CHAMPS_RNE = {
+    **CHAMPS_IDENTITE,
+    "date_debut_mandat": "date_debut_mandat",
+    "fonction": "fonction",
+    "ordre_fonction": "ordre_fonction",
+    "date_debut_fonction": "date_debut_fonction",
+}
+
+
+class DeputeExportView(BaseExportView):
+    queryset = Depute.objects.all()
+    nom_fichier = "deputes"
+    champs = {
+        "code": "code",
+        **CHAMPS_IDENTITE,
+        "circonscription": "circonscription__code",
+        "groupe": "groupe",
+        "relation": "relation",
+        "parti": "parti",
+        "legislature": "legislature",
+        "date_debut_mandat": "date_debut_mandat",
+        "date_fin_mandat": "date_fin_mandat",
+    }
+    filtres = {"departement": "circonscription__departement__code"}
+
+
+class EluMunicipalExportView(BaseExportView):
+    queryset = EluMunicipal.objects.all()
+    nom_fichier = "elus_municipaux"
+    champs = {
+        **CHAMPS_RNE,
+        "code_commune": "commune__code",
+        "type_commune": "commune__type",
+        "date_debut_mandat_epci": "date_debut_mandat_epci",
+        "fonction_epci": "fonction_epci",
+        "date_debut_fonction_epci": "date_debut_fonction_epci",
+        "nationalite": "nationalite",
+        "parrainage2017": "parrainage2017",
+    }
+    filtres = {
+        "commune": "commune__code",
+        "departement": "commune__departement__code",
+        "epci": "commune__epci__code",
+        "fonction": "fonction",
+    }
+
+
+class EluDepartementalExportView(BaseExportView):
+    queryset = EluDepartemental.objects.all()
+    nom_fichier = "elus_departementaux"
+    champs = {**CHAMPS_RNE, "code_canton": "canton__code"}
+    filtres = {
+        "canton": "canton__code",
+        "departement": "canton__departement__code",
+        "fonction": "fonction",
+    }
+
+
+class EluRegionalExportView(BaseExportView):
+    queryset = EluRegional.objects.all()
+    nom_fichier = "elus_regionaux"
+    champs = {**CHAMPS_RNE, "code_region": "region__code"}
+    filtres = {"region": "region__code", "fonction": "fonction"}
+
+
+class DeputeEuropeenExportView(BaseExportView):
+    queryset = DeputeEuropeen.objects.all()
+    nom_fichier = "deputes_europeens"
+    champs = {**CHAMPS_IDENTITE, "date_debut_mandat": "date_debut_mandat"}
+
+
+class BaseListeView(VersionCacheMixin, View):
+    """Vue de liste paginée des instances d'un modèle, filtrées par territoire
+
+    Les sous-classes définissent :
+
+    * :py:attr:`queryset`, le queryset de base, avec les `select_related`
+      nécessaires à la sérialisation ;
+    * :py:attr:`filtres`, la correspondance entre les paramètres GET de filtrage
+      acceptés et les chemins ORM correspondants ;
+    * :py:attr:`ordre`, les champs locaux selon lesquels ordonner les résultats,
+      dont le dernier doit être unique.
+    """
+
+    queryset = None
+    filtres = {}
+    ordre = ("nom", "prenom", "id")
+
+    def get_queryset(self):
+        return self.queryset.all()
+
+    def get(self, request, *args, **kwargs):
+        params = PaginationParametresForm(data=request.GET)
+
+        if not params.is_valid():
+            return repondre(request, {"errors": erreurs_formulaire(params)}, status=400)
+
+        qs = filtrer(self.get_queryset(), self.filtres, request.GET)
+        qs = qs.order_by(*self.ordre).sans_champs_lourds()
+
+        try:
+            resultats, suivant = paginer(qs, params.cleaned_data)
+        except ValidationError:
+            return reponse_curseur_invalide(request)
+        pagination = {"suivant": suivant} if suivant else {}
+
+        return repondre(
+            request, {"results": [r.as_dict() for r in resultats], **pagination}
+        )
+
+
+class EluMunicipalListeView(BaseListeView):
+    queryset = EluMunicipal.objects.select_related("commune")
+    filtres = {
+        "commune": "commune__code",
+        "type_commune": "commune__type",
+        "epci": "commune__epci__code",
+        "departement": "commune__departement__code",
+        "fonction": "fonction",
+    }
+
+
+class EluDepartementalListeView(BaseListeView):
+    queryset = EluDepartemental.objects.select_related("canton")
+    filtres = {
+        "canton": "canton__code",
+        "departement": "canton__departement__code",
+        "fonction": "fonction",
+    }
+
+
+class EluRegionalListeView(BaseListeView):
+    queryset = EluRegional.objects.select_related("region")
+    filtres = {"region": "region__code", "fonction": "fonction"}
+
+
+class DeputeListeView(BaseListeView):
+    queryset = Depute.objects.select_related("circonscription__departement")
+    filtres = {
+        "circonscription": "circonscription__code",
+        "departement": "circonscription__departement__code",
+        "groupe": "groupe",
+    }
+
+
+class DeputeEuropeenListeView(BaseListeView):
+    queryset = DeputeEuropeen.objects.all()
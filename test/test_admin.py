@@ -39,6 +39,12 @@ class AdminTestCase(TestCase):
         res = self.client.get(reverse("admin:data_france_departement_changelist"))
         self.assertEqual(200, res.status_code)
 
+        res = self.client.get(
+            reverse("admin:data_france_departement_changelist"), {"q": "doubs"}
+        )
+        self.assertEqual(200, res.status_code)
+        self.assertContains(res, "Doubs")
+
         c = Departement.objects.order_by("?").first()
 
         res = self.client.get(
@@ -0,0 +1,123 @@
+import random
+from unittest import skipIf
+
+from django.test import SimpleTestCase, TestCase, override_settings
+
+from data_france.autocompletion import (
+    Autocompletion,
+    autocompletion,
+    elements_requete,
+    snowballstemmer,
+)
+from data_france.models import Commune
+from data_france.search import normaliser_texte
+
+REQUETES = [
+    # préfixes courts, ordonnés selon le rang statique
+    "a",
+    "sa",
+    "mar",
+    "l",
+    "de",
+    "St",
+    # mots fléchis, racinisés
+    "montagnes",
+    "montagne",
+    "châteaux",
+    "chateau",
+    "sables",
+    "fontaines",
+    "saintes",
+    "roches",
+    # nombres, cherchés comme début de code
+    "2",
+    "25",
+    "250",
+    "2558",
+    "25580",
+    "59350",
+    "750012",
+    # plusieurs mots
+    "Besançon",
+    "marseille 13",
+    "13 marseille",
+    "saint-e",
+    "saint étienne",
+    "l’haÿ-les-r",
+    "sur mer",
+    "la roche sur",
+    "le puy en velay",
+    "villeneuve d",
+    "de la",
+]
+
+
+@skipIf(snowballstemmer is None, "snowballstemmer n'est pas installé")
+class ElementsRequeteTestCase(SimpleTestCase):
+    def test_mots_racinises_et_mots_vides_supprimes(self):
+        self.assertEqual(elements_requete("montagnes"), elements_requete("montagne"))
+        self.assertEqual(
+            elements_requete("Saint-Étienne"), [("saint", False), ("etien", True)]
+        )
+        self.assertEqual(elements_requete("le puy en v"), [("puy", False), ("v", True)])
+        self.assertEqual(elements_requete("de la"), [])
+
+    def test_nombres_inchanges(self):
+        self.assertEqual(
+            elements_requete("marseille 13"), [("marseil", False), ("13", True)]
+        )
+
+
+@skipIf(snowballstemmer is None, "snowballstemmer n'est pas installé")
+class AutocompletionTestCase(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.moteur = Autocompletion.depuis_base()
+
+    def assertMemesResultatsQueBase(self, termes):
+        resultats, _ = self.moteur.chercher(termes, limite=100000)
+        self.assertEqual(
+            [(c["code"], c["type"]) for c in resultats],
+            [(c.code, c.type) for c in Commune.objects.search(termes)],
+        )
+
+    def test_memes_communes_dans_le_meme_ordre_que_recherche_base(self):
+        for termes in REQUETES:
+            with self.subTest(termes=termes):
+                self.assertMemesResultatsQueBase(termes)
+
+    def test_memes_resultats_pour_les_noms_des_communes(self):
+        """Les débuts de noms de communes tirées au hasard donnent les mêmes résultats"""
+        generateur = random.Random(1)
+        ids = list(Commune.objects.values_list("id", flat=True))
+        for commune in Commune.objects.filter(id__in=generateur.sample(ids, 30)):
+            mots = normaliser_texte(commune.nom).split()
+            n = generateur.randint(1, len(mots))
+            dernier = mots[n - 1]
+            termes = " ".join(
+                mots[: n - 1] + [dernier[: generateur.randint(1, len(dernier))]]
+            )
+            with self.subTest(commune=commune.nom, termes=termes):
+                self.assertMemesResultatsQueBase(termes)
+
+    def test_communes_principales_en_premier(self):
+        resultats, _ = self.moteur.chercher("marseille", types=["COM"])
+        self.assertEqual(resultats[0]["code"], "13055")
+
+    def test_pagination(self):
+        page, suivant = self.moteur.chercher("saint", limite=5)
+        page2, _ = self.moteur.chercher("saint", limite=5, apres=suivant)
+        tout, _ = self.moteur.chercher("saint", limite=10)
+
+        self.assertEqual(page + page2, tout)
+
+    def test_cle_invalide(self):
+        with self.assertRaises(ValueError):
+            self.moteur.chercher("saint", apres=["a", 1])
+
+    @override_settings(DATA_FRANCE_AUTOCOMPLETION=True)
+    def test_moteur_partage(self):
+        self.assertIs(autocompletion(), autocompletion())
+
+    def test_moteur_desactive_par_defaut(self):
+        self.assertIsNone(autocompletion())
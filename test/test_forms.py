@@ -0,0 +1,60 @@
+from django import forms
+from django.core.exceptions import ImproperlyConfigured
+from django.http import QueryDict
+from django.test import SimpleTestCase
+
+from data_france.forms import (
+    CommuneParametresForm,
+    CommuneParCodeParametresForm,
+    ParCodeParametresForm,
+    ParseurParametres,
+    RechercheParametresForm,
+    parseur,
+)
+
+
+class ParseurParametresTestCase(SimpleTestCase):
+    requetes = [
+        "",
+        "q=a",
+        "q=a&limit=0",
+        "q=a&limit=abc",
+        "q=a&limit=5&type=COM&type=ARM&geojson=1",
+        "q=a&type=XX&geojson=false",
+        "q=a&apres=zzz",
+        "q=a&apres=WzEsMl0=",
+        "q=a&apres=W1sxXSwge31d",
+        "code=59350&type=COM",
+        "code=&geojson=on",
+    ]
+
+    def test_meme_resultat_que_formulaire(self):
+        for form_class in [
+            CommuneParametresForm,
+            RechercheParametresForm,
+            ParCodeParametresForm,
+            CommuneParCodeParametresForm,
+        ]:
+            for requete in self.requetes:
+                with self.subTest(form_class=form_class.__name__, requete=requete):
+                    form = form_class(data=QueryDict(requete))
+                    form.is_valid()
+
+                    cleaned_data, erreurs = parseur(form_class).valider(
+                        QueryDict(requete)
+                    )
+
+                    self.assertEqual(cleaned_data, form.cleaned_data)
+                    self.assertEqual(
+                        erreurs, {k: list(v) for k, v in form.errors.items()}
+                    )
+
+    def test_refuse_formulaire_avec_clean(self):
+        class Form(forms.Form):
+            a = forms.CharField()
+
+            def clean(self):
+                return self.cleaned_data
+
+        with self.assertRaises(ImproperlyConfigured):
+            ParseurParametres(Form)
@@ -0,0 +1,28 @@
+import numpy as np
+from django.test import TestCase
+
+from data_france.geo import Localisateur
+from data_france.models import Commune
+
+
+class LocalisateurTestCase(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        communes = Commune.objects.filter(type="COM", departement__code="25")
+        cls.points = {c.code: c.geometry.point_on_surface for c in communes[:20]}
+
+    def verifier_localisateur(self, localisateur):
+        codes = list(self.points)
+        lats = np.array([self.points[c].y for c in codes] + [0.0])
+        lons = np.array([self.points[c].x for c in codes] + [0.0])
+
+        self.assertEqual(list(localisateur.localiser(lats, lons)), codes + [None])
+
+    def test_localisateur_depuis_base(self):
+        self.verifier_localisateur(Localisateur.depuis_base())
+
+    def test_localisateur_geometries_preparees(self):
+        self.verifier_localisateur(Localisateur.depuis_base(preparer=True))
+
+    def test_localisateur_depuis_fichier(self):
+        self.verifier_localisateur(Localisateur.depuis_fichier())
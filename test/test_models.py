@@ -1,4 +1,6 @@
-from django.test import TestCase
+from django.contrib.postgres.search import SearchRank
+from django.db.models import F, Q
+from django.test import TestCase, override_settings
 
 from data_france.models import (
     Commune,
@@ -10,7 +12,12 @@ from data_france.models import (
     CollectiviteRegionale,
     CirconscriptionConsulaire,
     CirconscriptionLegislative,
+    Canton,
+    Depute,
+    EluDepartemental,
+    EluRegional,
 )
+from data_france.search import PrefixSearchQuery
 
 
 class CommuneTestCase(TestCase):
@@ -204,3 +211,176 @@ class CirconscriptionConsulaireTest(TestCase):
 class CirconscriptionLegislativeTest(TestCase):
     def test_import_correct(self):
         self.assertEqual(CirconscriptionLegislative.objects.count(), 577)
+
+
+class SansChampsLourdsTestCase(TestCase):
+    def test_recherche_sans_geometrie(self):
+        c = Commune.objects.search("etalans").get()
+        self.assertIn("geometry", c.get_deferred_fields())
+        self.assertIn("mairie_horaires", c.get_deferred_fields())
+
+        c = Commune.objects.search("etalans", geometrie=True).get()
+        self.assertNotIn("geometry", c.get_deferred_fields())
+
+    def test_relations_sans_geometrie(self):
+        c = (
+            Commune.objects.select_related("departement")
+            .sans_champs_lourds("geometry")
+            .get(type="COM", code="25222")
+        )
+        self.assertNotIn("geometry", c.get_deferred_fields())
+        self.assertIn("search", c.get_deferred_fields())
+        self.assertIn("geometry", c.departement.get_deferred_fields())
+
+
+class RechercheApprocheeTestCase(TestCase):
+    def test_trouve_nom_avec_faute(self):
+        self.assertFalse(Commune.objects.search("Marseile").filter(type="COM").exists())
+
+        resultats = Commune.objects.search("Marseile", approchee=True).filter(
+            type="COM"
+        )
+        self.assertEqual(resultats.first().code, "13055")
+
+    def test_nom_sans_accent_ni_tiret(self):
+        resultats = Commune.objects.search("chalon sur sone", approchee=True)
+        self.assertIn("71076", [c.code for c in resultats[:10]])
+
+    def test_pas_de_recherche_approchee_si_assez_de_resultats(self):
+        self.assertEqual(
+            Commune.objects.search("saint", approchee=True).count(),
+            Commune.objects.search("saint").count(),
+        )
+
+    def test_modele_sans_recherche_approchee(self):
+        with self.assertRaises(ValueError):
+            CirconscriptionConsulaire.objects.search("paris", approchee=True)
+
+
+class RechercheParPrefixeCourtTestCase(TestCase):
+    def test_memes_resultats_que_filtre_plein_texte(self):
+        self.assertEqual(
+            Commune.objects.search("sa").count(),
+            Commune.objects.filter(
+                search=PrefixSearchQuery("sa", config="data_france_search")
+            ).count(),
+        )
+
+    def test_ordonne_selon_rang_statique(self):
+        resultats = list(Commune.objects.search("sai")[:20])
+
+        self.assertEqual(
+            [(c.rank, c.id) for c in resultats],
+            sorted(
+                ((c.rang_recherche, c.id) for c in resultats),
+                key=lambda r: (-r[0], r[1]),
+            ),
+        )
+        self.assertGreater(resultats[0].rank, 0)
+
+
+class RechercheParCodeTestCase(TestCase):
+    def test_trouve_par_debut_de_code_insee_ou_postal(self):
+        self.assertCountEqual(
+            Commune.objects.search("251").values_list("id", flat=True),
+            Commune.objects.filter(
+                Q(code__startswith="251") | Q(codes_postaux__code__startswith="251")
+            )
+            .distinct()
+            .values_list("id", flat=True),
+        )
+
+    def test_code_complet(self):
+        self.assertEqual(Commune.objects.search("25222").first().nom, "Étalans")
+        self.assertIn(
+            ("ARM", "75101"),
+            Commune.objects.search("75001").values_list("type", "code"),
+        )
+
+    def test_ordonne_selon_rang_statique(self):
+        resultats = list(Commune.objects.search("75")[:20])
+
+        self.assertEqual(
+            [c.rank for c in resultats],
+            sorted((c.rang_recherche for c in resultats), reverse=True),
+        )
+
+
+class PopulariteTestCase(TestCase):
+    def test_popularite_entre_0_et_1(self):
+        self.assertFalse(
+            Commune.objects.filter(popularite__lt=0).exists()
+            or Commune.objects.filter(popularite__gt=1).exists()
+        )
+
+    def test_grandes_villes_en_premier(self):
+        self.assertEqual(Commune.objects.search("paris").first().code, "75056")
+        self.assertEqual(
+            Commune.objects.search("marseille").filter(type="COM").first().code,
+            "13055",
+        )
+
+    def test_arrondissements_apres_leur_commune(self):
+        paris = Commune.objects.get(type="COM", code="75056")
+        self.assertFalse(
+            Commune.objects.filter(
+                type="ARM", popularite__gte=paris.popularite
+            ).exists()
+        )
+
+    @override_settings(DATA_FRANCE_POIDS_POPULARITE=0)
+    def test_poids_nul(self):
+        self.assertEqual(
+            [c.rank for c in Commune.objects.search("paris")[:5]],
+            [
+                c.rank
+                for c in Commune.objects.filter(
+                    search=PrefixSearchQuery("paris", config="data_france_search")
+                )
+                .annotate(
+                    rank=SearchRank(
+                        F("search"),
+                        PrefixSearchQuery("paris", config="data_france_search"),
+                        normalization=8,
+                    )
+                )
+                .order_by("-rank", "id")[:5]
+            ],
+        )
+
+
+class RechercheAutresEntitesTestCase(TestCase):
+    def test_vecteurs_de_recherche_remplis(self):
+        for model in [
+            EPCI,
+            Departement,
+            Region,
+            Canton,
+            Depute,
+            EluDepartemental,
+            EluRegional,
+        ]:
+            with self.subTest(model=model.__name__):
+                self.assertFalse(model.objects.filter(search__isnull=True).exists())
+
+    def test_recherche_par_nom_et_code(self):
+        self.assertEqual(Departement.objects.search("doubs").first().code, "25")
+        self.assertEqual(Departement.objects.search("25").first().code, "25")
+        self.assertIn(
+            "27",
+            Region.objects.search("bourgogne").values_list("code", flat=True),
+        )
+
+    def test_recherche_epci_et_cantons(self):
+        epci = EPCI.objects.order_by("code").first()
+        self.assertIn(epci, EPCI.objects.search(epci.nom))
+
+        canton = Canton.objects.order_by("code").first()
+        self.assertIn(canton, Canton.objects.search(f"{canton.nom} {canton.code}"))
+
+    def test_recherche_elus(self):
+        elu = EluDepartemental.objects.select_related("canton").first()
+        self.assertIn(elu, EluDepartemental.objects.search(f"{elu.prenom} {elu.nom}"))
+
+        elu = EluRegional.objects.select_related("region").first()
+        self.assertIn(elu, EluRegional.objects.search(f"{elu.nom} {elu.region.nom}"))
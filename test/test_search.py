@@ -0,0 +1,133 @@
+import random
+import re
+
+from django.db import connection
+from django.test import SimpleTestCase, TestCase
+
+from data_france.models import Commune
+from data_france.search import normaliser_texte, requete_prefixe, surligner
+
+LETTRES = "abcdefghijklmnopqrstuvwxyzàâäçéèêëîïôöùûüÿñœæß"
+PONCTUATION = " -'’.,;:!?&|()<>$*\"\t"
+ALPHABET = LETTRES + LETTRES.upper() + "0123456789" + PONCTUATION
+
+NOMBRE_EXEMPLES = 500
+
+
+def textes_aleatoires(graine, nombre=NOMBRE_EXEMPLES, longueur_max=30):
+    """Génère des textes aléatoires, de façon reproductible"""
+    generateur = random.Random(graine)
+    for _ in range(nombre):
+        yield "".join(
+            generateur.choice(ALPHABET)
+            for _ in range(generateur.randint(0, longueur_max))
+        )
+
+
+class NormalisationTestCase(SimpleTestCase):
+    def test_seulement_lettres_ascii_chiffres_et_espaces_simples(self):
+        for texte in textes_aleatoires(1):
+            with self.subTest(texte=texte):
+                self.assertRegex(
+                    normaliser_texte(texte), r"^([a-z0-9]+( [a-z0-9]+)*)?$"
+                )
+
+    def test_idempotente(self):
+        for texte in textes_aleatoires(2):
+            with self.subTest(texte=texte):
+                normalise = normaliser_texte(texte)
+                self.assertEqual(normaliser_texte(normalise), normalise)
+
+    def test_insensible_a_la_casse_aux_accents_et_a_la_ponctuation(self):
+        for texte in textes_aleatoires(3):
+            with self.subTest(texte=texte):
+                self.assertEqual(
+                    normaliser_texte(texte.upper()), normaliser_texte(texte.lower())
+                )
+                self.assertEqual(
+                    normaliser_texte(re.sub(r"[-'’]", " ", texte)),
+                    normaliser_texte(texte),
+                )
+
+        self.assertEqual(normaliser_texte("Saint-Étienne"), "saint etienne")
+        self.assertEqual(normaliser_texte("L’Haÿ-les-Roses"), "l hay les roses")
+        self.assertEqual(normaliser_texte("Œuvre"), "oeuvre")
+
+    def test_requete_composee_des_mots_normalises(self):
+        for texte in textes_aleatoires(4):
+            with self.subTest(texte=texte):
+                requete = requete_prefixe(texte)
+                mots = normaliser_texte(texte).split()
+
+                if not mots:
+                    self.assertEqual(requete, "")
+                    continue
+
+                self.assertTrue(requete.endswith(":*"))
+                self.assertEqual(requete[:-2].split(" & "), mots)
+
+    def test_requete_identique_quelle_que_soit_la_ponctuation(self):
+        self.assertEqual(requete_prefixe("saint-e"), requete_prefixe("saint e"))
+        self.assertEqual(requete_prefixe("saint–e"), requete_prefixe("Saint E"))
+        self.assertEqual(requete_prefixe("l’haÿ"), requete_prefixe("l'hay"))
+
+
+class SurlignageTestCase(SimpleTestCase):
+    def test_surligne_prefixes_des_mots(self):
+        self.assertEqual(
+            surligner("saint-e", ["Saint-Étienne", "Sainte-Foy", "Paris"]),
+            [[[0, 5], [6, 7]], [[0, 5]], []],
+        )
+        self.assertEqual(
+            surligner("l’hay les r", ["L'Haÿ-les-Roses"]),
+            [[[0, 1], [2, 5], [6, 9], [10, 11]]],
+        )
+        self.assertEqual(surligner("oeu", ["Œuilly"]), [[[0, 2]]])
+        self.assertEqual(surligner("cafe", ["Cafe\u0301 du port"]), [[[0, 5]]])
+
+    def test_surlignages_correspondent_aux_mots_normalises(self):
+        for texte in textes_aleatoires(6):
+            termes = " ".join(normaliser_texte(texte).split()[-2:])[:-1]
+            with self.subTest(texte=texte, termes=termes):
+                (intervalles,) = surligner(termes, [texte])
+                mots = normaliser_texte(termes).split()
+
+                for debut, fin in intervalles:
+                    partie = normaliser_texte(texte[debut:fin])
+                    self.assertTrue(any(partie.startswith(m) for m in mots))
+                if mots:
+                    self.assertTrue(intervalles)
+
+
+class NormalisationBaseTestCase(TestCase):
+    def normaliser_en_base(self, textes):
+        with connection.cursor() as cursor:
+            cursor.execute(
+                "SELECT data_france_normaliser(t) FROM unnest(%s::text[]) "
+                "WITH ORDINALITY AS u(t, n) ORDER BY n",
+                [textes],
+            )
+            return [r[0] for r in cursor.fetchall()]
+
+    def test_meme_normalisation_en_python_et_en_sql(self):
+        textes = list(textes_aleatoires(5))
+
+        self.assertEqual(
+            self.normaliser_en_base(textes), [normaliser_texte(t) for t in textes]
+        )
+
+    def test_memes_mots_dans_les_vecteurs_et_les_requetes(self):
+        """Chaque mot normalisé d'un nom, pris comme préfixe, retrouve la commune"""
+        for commune in Commune.objects.filter(nom__regex=r"[-'’]")[:50]:
+            mots = normaliser_texte(commune.nom).split()
+            for i, mot in enumerate(mots):
+                termes = " ".join(mots[:i] + [mot[:2]])
+                with self.subTest(commune=commune.nom, termes=termes):
+                    self.assertIn(commune, Commune.objects.search(termes))
+
+    def test_recherche_avec_tiret_et_apostrophe(self):
+        self.assertIn(
+            "42218",
+            Commune.objects.search("saint-e").values_list("code", flat=True)[:20],
+        )
+        self.assertEqual(Commune.objects.search("l’haÿ-les-r").first().code, "94038")
@@ -1,13 +1,45 @@
 import json
-
-from django.http import QueryDict
-from django.test import TestCase, RequestFactory
-
-from data_france.models import Commune, Departement
+import threading
+from unittest import skipIf
+from unittest.mock import patch
+
+from asgiref.sync import async_to_sync
+from django.db import connection, connections
+from django.http import Http404, QueryDict
+from django.test import TestCase, RequestFactory, override_settings
+
+from data_france.asynchrone import vue_asynchrone
+from data_france import documents
+from data_france.cache import cache_par_code
+from data_france.forms import encoder_curseur
+from data_france.formats import FORMAT_JSON, FORMAT_MSGPACK, format_reponse, msgpack
+from data_france.models import (
+    Commune,
+    Departement,
+    EPCI,
+    CodePostal,
+    EluMunicipal,
+    DocumentPrecalcule,
+    CollectiviteRegionale,
+    SearchQueryset,
+)
 from data_france.views import (
     RechercheCommuneView,
     CommuneParCodeView,
     DepartementParCodeView,
+    CommuneExportView,
+    EPCIParCodeView,
+    CodePostalParCodeView,
+    LocaliserView,
+    LocaliserLotView,
+    EluMunicipalListeView,
+    RechercheEluMunicipalView,
+    RechercheGlobaleView,
+    DeputeListeView,
+    DepartementListeView,
+    CollectiviteRegionaleListeView,
+    recherches_communes,
+    requete_recherche_communes,
 )
 
 
@@ -70,6 +102,30 @@ class CommuneSearchViewTestCase(ViewTestCase):
             self.get_status_json(res),
         )
 
+    def test_surlignage(self):
+        req = self.factory.get(
+            f"/communes/?{self.query_builder({'q': 'etalans', 'highlight': '1'})}"
+        )
+        status, results = self.get_status_json(self.view(req))
+
+        self.assertEqual(status, 200)
+        self.assertEqual(
+            results["results"][0]["highlight"], {"nom": [[0, 7]], "code": []}
+        )
+
+    @override_settings(DATA_FRANCE_AUTOCOMPLETION=True)
+    def test_surlignage_en_memoire(self):
+        req = self.factory.get(
+            f"/communes/?{self.query_builder({'q': 'etalans', 'highlight': '1'})}"
+        )
+        status, results = self.get_status_json(self.view(req))
+        self.assertEqual(results["results"][0]["highlight"]["nom"], [[0, 7]])
+
+        # les documents du moteur en mémoire ne sont pas modifiés
+        req = self.factory.get(f"/communes/?{self.query_builder({'q': 'etalans'})}")
+        status, results = self.get_status_json(self.view(req))
+        self.assertNotIn("highlight", results["results"][0])
+
     def test_rechercher_avec_type(self):
         req = self.factory.get(f"/communes/?{self.query_builder({'q': 'Paris 13'})}")
         res = self.view(req)
@@ -123,6 +179,154 @@ class CommuneSearchViewTestCase(ViewTestCase):
         self.assertEqual(feature["geometry"], expected_geometry)
 
 
+class CommuneSearchPaginationTestCase(ViewTestCase):
+    view_class = RechercheCommuneView
+
+    def get_page(self, **params):
+        req = self.factory.get(f"/communes/?{self.query_builder(params)}")
+        return self.get_status_json(self.view(req))
+
+    def test_pagination_par_curseur(self):
+        status, page1 = self.get_page(q="saint", limit=5)
+        self.assertEqual(status, 200)
+        self.assertEqual(len(page1["results"]), 5)
+        self.assertIn("suivant", page1)
+
+        status, page2 = self.get_page(q="saint", limit=5, apres=page1["suivant"])
+        self.assertEqual(status, 200)
+        self.assertEqual(len(page2["results"]), 5)
+
+        status, pages = self.get_page(q="saint", limit=10)
+        self.assertEqual(
+            [c["code"] for c in pages["results"]],
+            [c["code"] for c in page1["results"] + page2["results"]],
+        )
+
+    def test_pas_de_curseur_pour_la_derniere_page(self):
+        status, results = self.get_page(q="etalans")
+        self.assertEqual(status, 200)
+        self.assertNotIn("suivant", results)
+
+    def test_curseur_avec_valeurs_non_scalaires(self):
+        # [[1], {}]
+        status, results = self.get_page(q="saint", apres="W1sxXSwge31d")
+        self.assertEqual(status, 400)
+        self.assertEqual(list(results["errors"]), ["apres"])
+
+    def test_curseur_ne_correspondant_pas_a_l_ordre(self):
+        status, results = self.get_page(q="saint", apres=encoder_curseur([1]))
+        self.assertEqual(status, 400)
+        self.assertEqual(
+            results["errors"], {"apres": ["Curseur de pagination invalide."]}
+        )
+
+    def test_pagination_recherche_par_code(self):
+        status, page1 = self.get_page(q="75", limit=5)
+        status, page2 = self.get_page(q="75", limit=5, apres=page1["suivant"])
+
+        status, pages = self.get_page(q="75", limit=10)
+        self.assertEqual(
+            [c["code"] for c in pages["results"]],
+            [c["code"] for c in page1["results"] + page2["results"]],
+        )
+
+    def test_parametres_de_pagination_invalides(self):
+        status, results = self.get_page(q="saint", limit=1000, apres="invalide")
+        self.assertEqual(status, 400)
+        self.assertCountEqual(results["errors"], ["limit", "apres"])
+
+
+class RecherchesCompileesTestCase(TestCase):
+    types = ("COM", "ARM")
+
+    def verifier_memes_resultats(self):
+        for q in ["sa", "saint etienne", "paris 13", "!!", "75", "25222"]:
+            for approchee in [False, True]:
+                with self.subTest(q=q, approchee=approchee):
+                    self.assertEqual(
+                        list(
+                            recherches_communes.evaluer(
+                                q, self.types, False, approchee, 11
+                            )
+                        ),
+                        list(
+                            requete_recherche_communes(
+                                q, self.types, False, approchee, 11
+                            )
+                        ),
+                    )
+
+    def test_memes_resultats_que_requete_construite(self):
+        self.verifier_memes_resultats()
+
+    @override_settings(DATA_FRANCE_REQUETES_PREPAREES=True)
+    def test_memes_resultats_avec_requetes_preparees(self):
+        self.verifier_memes_resultats()
+        # la seconde fois, les requêtes déjà préparées sont réutilisées
+        self.verifier_memes_resultats()
+
+    def test_compilation_unique_par_forme(self):
+        recherches_communes.evaluer("marseille", self.types, False, False, 11)
+        compilations = recherches_communes._compiler.cache_info().misses
+
+        resultats = recherches_communes.evaluer("lyon", self.types, False, False, 11)
+
+        self.assertEqual(
+            recherches_communes._compiler.cache_info().misses, compilations
+        )
+        self.assertEqual(resultats[0].code, "69123")
+
+    def evaluer_dans_un_autre_thread(self, *args):
+        resultats = {}
+
+        def evaluer():
+            try:
+                resultats["communes"] = list(recherches_communes.evaluer(*args))
+            except Exception as e:
+                resultats["erreur"] = e
+            finally:
+                connections.close_all()
+
+        thread = threading.Thread(target=evaluer)
+        thread.start()
+        thread.join()
+
+        if "erreur" in resultats:
+            raise resultats["erreur"]
+        return resultats["communes"]
+
+    def test_evaluation_depuis_un_autre_thread(self):
+        attendus = list(
+            recherches_communes.evaluer("lyon", self.types, False, False, 11)
+        )
+
+        self.assertEqual(
+            [
+                c.code
+                for c in self.evaluer_dans_un_autre_thread(
+                    "lyon", self.types, False, False, 11
+                )
+            ],
+            [c.code for c in attendus],
+        )
+
+    @override_settings(DATA_FRANCE_REQUETES_PREPAREES=True)
+    def test_evaluation_depuis_un_autre_thread_avec_requetes_preparees(self):
+        attendus = list(
+            recherches_communes.evaluer("lyon", self.types, False, False, 11)
+        )
+
+        self.assertEqual(
+            [
+                c.code
+                for c in self.evaluer_dans_un_autre_thread(
+                    "lyon", self.types, False, False, 11
+                )
+            ],
+            [c.code for c in attendus],
+        )
+
+
 class CommuneParCodeViewTestCase(ViewTestCase):
     view_class = CommuneParCodeView
 
@@ -149,6 +353,106 @@ class CommuneParCodeViewTestCase(ViewTestCase):
         )
 
 
+class DocumentsPrecalculesParCodeTestCase(ViewTestCase):
+    view_class = DepartementParCodeView
+
+    def get_departement(self, **params):
+        req = self.factory.get(f"/departements/?{self.query_builder(params)}")
+        return self.get_status_json(self.view(req))
+
+    def test_reponse_depuis_document(self):
+        d = Departement.objects.select_related("chef_lieu").get(code="25")
+        # la version des données est lue une première fois, puis gardée en mémoire
+        self.get_departement(code="39")
+
+        with self.assertNumQueries(1):
+            status, results = self.get_departement(code="25")
+
+        self.assertEqual(status, 200)
+        self.assertEqual(results, d.as_dict())
+
+    def test_reponse_geojson_depuis_document(self):
+        d = Departement.objects.select_related("chef_lieu").get(code="25")
+
+        status, results = self.get_departement(code="25", geojson="1")
+
+        self.assertEqual(status, 200)
+        self.assertEqual(results["properties"], d.as_dict())
+        self.assertEqual(results["geometry"], json.loads(d.geometry.geojson))
+
+    def test_repli_sans_document(self):
+        avec_document = self.get_departement(code="25")
+        DocumentPrecalcule.objects.filter(cle__startswith="entites/").delete()
+
+        self.assertEqual(self.get_departement(code="25"), avec_document)
+        self.assertEqual(self.get_departement(code="XX")[0], 404)
+
+
+class VueAsynchroneTestCase(ViewTestCase):
+    view_class = CommuneParCodeView
+
+    def test_meme_reponse_que_vue_synchrone(self):
+        c = Commune.objects.filter(type="COM").first()
+        req = self.factory.get(
+            f"/communes/par-code/?{self.query_builder({'code': c.code, 'type': 'COM'})}"
+        )
+
+        res_sync = self.view(req)
+        res_async = async_to_sync(vue_asynchrone(self.view))(req)
+
+        self.assertEqual(res_async.status_code, 200)
+        self.assertEqual(
+            self.get_status_json(res_async), self.get_status_json(res_sync)
+        )
+
+    def test_conserve_attributs_vue(self):
+        vue = LocaliserLotView.as_view()
+        vue_async = vue_asynchrone(vue)
+
+        self.assertIs(vue_async.view_class, LocaliserLotView)
+        self.assertTrue(vue_async.csrf_exempt)
+
+
+class EPCIViewTestCase(ViewTestCase):
+    view_class = EPCIParCodeView
+
+    def test_obtenir_epci_specifique(self):
+        e = EPCI.objects.order_by("?").first()
+
+        req = self.factory.get(f"/epci/?{self.query_builder({'code': e.code})}")
+        res = self.view(req)
+
+        status, results = self.get_status_json(res)
+
+        self.assertEqual(status, 200)
+        self.assertEqual(
+            results["communes"],
+            {c.code: c.nom for c in e.communes.all()},
+        )
+
+
+class CodePostalViewTestCase(ViewTestCase):
+    view_class = CodePostalParCodeView
+
+    def test_obtenir_code_postal_specifique(self):
+        req = self.factory.get(f"/code-postal/?{self.query_builder({'code': '25580'})}")
+        res = self.view(req)
+
+        status, results = self.get_status_json(res)
+
+        self.assertEqual(status, 200)
+        self.assertEqual(
+            results,
+            {
+                "code": "25580",
+                "communes": {
+                    c.code: c.nom_complet
+                    for c in CodePostal.objects.get(code="25580").communes.all()
+                },
+            },
+        )
+
+
 class DepartementViewTestCase(ViewTestCase):
     view_class = DepartementParCodeView
 
@@ -214,3 +518,475 @@ class DepartementViewTestCase(ViewTestCase):
         res = self.view(req)
 
         self.assertEqual(res.status_code, 400)
+
+
+class DepartementListeViewTestCase(ViewTestCase):
+    view_class = DepartementListeView
+
+    def test_lister_departements(self):
+        req = self.factory.get("/departements/")
+        status, results = self.get_status_json(self.view(req))
+
+        self.assertEqual(status, 200)
+        self.assertEqual(
+            results["results"],
+            [d.as_dict() for d in Departement.objects.select_related("chef_lieu")],
+        )
+
+    def test_lister_departements_geojson(self):
+        req = self.factory.get("/departements/?geojson=1")
+        status, results = self.get_status_json(self.view(req))
+
+        self.assertEqual(status, 200)
+        self.assertEqual(results["type"], "FeatureCollection")
+        self.assertEqual(len(results["features"]), Departement.objects.count())
+        self.assertIn(
+            results["features"][0]["geometry"]["type"], ["Polygon", "MultiPolygon"]
+        )
+
+    def test_calcul_a_la_volee_sans_document(self):
+        DocumentPrecalcule.objects.all().delete()
+        documents._documents.vider()
+
+        req = self.factory.get("/collectivites-regionales/?geojson=1")
+        status, results = self.get_status_json(
+            CollectiviteRegionaleListeView.as_view()(req)
+        )
+
+        self.assertEqual(status, 200)
+        self.assertEqual(
+            [f["properties"] for f in results["features"]],
+            [c.as_dict() for c in CollectiviteRegionale.objects.all()],
+        )
+
+
+class CommuneExportViewTestCase(ViewTestCase):
+    view_class = CommuneExportView
+
+    def get_content(self, res):
+        self.assertEqual(res.status_code, 200)
+        return b"".join(res.streaming_content).decode("utf-8")
+
+    def test_exporter_en_ndjson(self):
+        req = self.factory.get(
+            f"/exporter/communes/?{self.query_builder([('departement', '25'), ('champs', 'code'), ('champs', 'nom')])}"
+        )
+        res = self.view(req)
+        self.assertEqual(res["Content-Type"], "application/x-ndjson")
+
+        lignes = [json.loads(ligne) for ligne in self.get_content(res).splitlines()]
+
+        self.assertEqual(
+            len(lignes), Commune.objects.filter(departement__code="25").count()
+        )
+        self.assertIn({"code": "25222", "nom": "Étalans"}, lignes)
+
+    def test_exporter_en_csv(self):
+        req = self.factory.get(
+            f"/exporter/communes/?{self.query_builder([('format', 'csv'), ('type', 'ARM'), ('champs', 'code')])}"
+        )
+        res = self.view(req)
+        self.assertEqual(res["Content-Type"], "text/csv")
+
+        lignes = self.get_content(res).splitlines()
+        self.assertEqual(lignes[0], "code")
+        self.assertEqual(len(lignes), 1 + 20 + 9 + 16)
+
+    def test_champ_inconnu(self):
+        req = self.factory.get(
+            f"/exporter/communes/?{self.query_builder({'champs': 'geometry'})}"
+        )
+        res = self.view(req)
+
+        status, results = self.get_status_json(res)
+        self.assertEqual(status, 400)
+        self.assertCountEqual(results["errors"], ["champs"])
+
+
+class CacheHTTPTestCase(ViewTestCase):
+    view_class = DepartementParCodeView
+
+    def test_etag_et_reponse_304(self):
+        req = self.factory.get(f"/departements/?{self.query_builder({'code': '25'})}")
+        res = self.view(req)
+
+        self.assertEqual(res.status_code, 200)
+        self.assertIn("ETag", res)
+        self.assertIn("Last-Modified", res)
+        self.assertIn("max-age", res["Cache-Control"])
+
+        req = self.factory.get(
+            f"/departements/?{self.query_builder({'code': '25'})}",
+            HTTP_IF_NONE_MATCH=res["ETag"],
+        )
+        with self.assertNumQueries(0):
+            res = self.view(req)
+
+        self.assertEqual(res.status_code, 304)
+
+
+@override_settings(DATA_FRANCE_PAR_CODE_CACHE_SIZE=2)
+class CacheParCodeTestCase(ViewTestCase):
+    view_class = DepartementParCodeView
+
+    def setUp(self) -> None:
+        super().setUp()
+        cache_par_code().vider()
+
+    def get_departement(self, code):
+        req = self.factory.get(f"/departements/?{self.query_builder({'code': code})}")
+        return self.get_status_json(self.view(req))
+
+    def test_reponses_mises_en_cache(self):
+        premiere = self.get_departement("25")
+        self.assertEqual(premiere[0], 200)
+
+        with self.assertNumQueries(0):
+            self.assertEqual(self.get_departement("25"), premiere)
+
+        self.assertEqual(cache_par_code().infos()["hits"], 1)
+        self.assertEqual(cache_par_code().infos()["misses"], 1)
+
+    def test_taille_bornee(self):
+        for code in ["25", "39", "70", "25"]:
+            self.get_departement(code)
+
+        infos = cache_par_code().infos()
+        self.assertEqual(infos["entrees"], 2)
+        self.assertEqual(infos["hits"], 0)
+
+
+class LocaliserViewTestCase(ViewTestCase):
+    view_class = LocaliserView
+
+    def test_localiser_point(self):
+        etalans = Commune.objects.get(type="COM", code="25222")
+        point = etalans.geometry.point_on_surface
+
+        req = self.factory.get(
+            f"/localiser/?{self.query_builder({'lat': point.y, 'lon': point.x})}"
+        )
+        status, results = self.get_status_json(self.view(req))
+
+        self.assertEqual(status, 200)
+        self.assertEqual(results["commune"]["code"], "25222")
+        self.assertEqual(results["departement"], {"code": "25", "nom": "Doubs"})
+        self.assertEqual(results["region"]["code"], "27")
+        self.assertEqual(results["epci"]["code"], etalans.epci.code)
+        self.assertTrue(
+            results["circonscription_legislative"]["code"].startswith("25-")
+        )
+
+    def test_point_hors_de_france(self):
+        req = self.factory.get(
+            f"/localiser/?{self.query_builder({'lat': 0, 'lon': 0})}"
+        )
+        with self.assertRaises(Http404):
+            self.view(req)
+
+    def test_localiser_lot(self):
+        etalans = Commune.objects.get(type="COM", code="25222")
+        point = etalans.geometry.point_on_surface
+
+        req = self.factory.post(
+            "/localiser/lot/",
+            data={"points": [[point.y, point.x], [0, 0]]},
+            content_type="application/json",
+        )
+        status, results = self.get_status_json(LocaliserLotView.as_view()(req))
+
+        self.assertEqual(status, 200)
+        self.assertEqual(len(results["results"]), 2)
+        self.assertEqual(results["results"][0]["commune"]["code"], "25222")
+        self.assertIsNone(results["results"][1])
+
+    def test_localiser_lot_points_invalides(self):
+        req = self.factory.post(
+            "/localiser/lot/",
+            data='{"points": [[47, 6], [NaN, 6], [47, Infinity], [91, 6], [47, -181]]}',
+            content_type="application/json",
+        )
+        status, results = self.get_status_json(LocaliserLotView.as_view()(req))
+
+        self.assertEqual(status, 400)
+        self.assertCountEqual(results["errors"]["points"], ["1", "2", "3", "4"])
+        self.assertEqual(list(results["errors"]["points"]["3"]), ["lat"])
+        self.assertEqual(list(results["errors"]["points"]["4"]), ["lon"])
+
+
+class EluMunicipalListeViewTestCase(ViewTestCase):
+    view_class = EluMunicipalListeView
+
+    def test_elus_d_une_commune(self):
+        req = self.factory.get(
+            f"/elus-municipaux/?{self.query_builder({'commune': '25222', 'limit': 100})}"
+        )
+        status, results = self.get_status_json(self.view(req))
+
+        self.assertEqual(status, 200)
+        self.assertCountEqual(
+            [e["id"] for e in results["results"]],
+            EluMunicipal.objects.filter(commune__code="25222").values_list(
+                "id", flat=True
+            ),
+        )
+        self.assertEqual(results["results"][0]["commune"]["code"], "25222")
+
+    def test_pagination(self):
+        params = {"departement": "25", "limit": 20}
+        req = self.factory.get(f"/elus-municipaux/?{self.query_builder(params)}")
+        status, page1 = self.get_status_json(self.view(req))
+
+        req = self.factory.get(
+            f"/elus-municipaux/?{self.query_builder({**params, 'apres': page1['suivant']})}"
+        )
+        status, page2 = self.get_status_json(self.view(req))
+
+        self.assertEqual(status, 200)
+        self.assertEqual(len(page2["results"]), 20)
+        self.assertFalse(
+            {e["id"] for e in page1["results"]} & {e["id"] for e in page2["results"]}
+        )
+
+    def test_curseur_ne_correspondant_pas_a_l_ordre(self):
+        params = {"departement": "25", "apres": encoder_curseur(["Dupont"])}
+        req = self.factory.get(f"/elus-municipaux/?{self.query_builder(params)}")
+        status, results = self.get_status_json(self.view(req))
+
+        self.assertEqual(status, 400)
+        self.assertEqual(
+            results["errors"], {"apres": ["Curseur de pagination invalide."]}
+        )
+
+
+class DeputeListeViewTestCase(ViewTestCase):
+    view_class = DeputeListeView
+
+    def test_deputes_d_un_departement(self):
+        req = self.factory.get(f"/deputes/?{self.query_builder({'departement': '25'})}")
+        status, results = self.get_status_json(self.view(req))
+
+        self.assertEqual(status, 200)
+        self.assertTrue(results["results"])
+        for depute in results["results"]:
+            self.assertTrue(depute["circonscription"]["code"].startswith("25-"))
+
+
+class RechercheEluMunicipalViewTestCase(ViewTestCase):
+    view_class = RechercheEluMunicipalView
+
+    def test_pagination_avec_rangs_egaux(self):
+        params = {"q": "etalans", "departement": "25"}
+        tous = list(
+            EluMunicipal.objects.search("etalans")
+            .filter(commune__departement__code="25")
+            .values_list("id", "rank")
+        )
+        # la recherche doit comporter des résultats de même rang
+        self.assertLess(len({rank for _, rank in tous}), len(tous))
+
+        ids = []
+        suivant = None
+        while True:
+            page_params = {**params, "limit": 2}
+            if suivant:
+                page_params["apres"] = suivant
+            req = self.factory.get(
+                f"/elus-municipaux/chercher/?{self.query_builder(page_params)}"
+            )
+            status, results = self.get_status_json(self.view(req))
+            self.assertEqual(status, 200)
+            ids.extend(e["id"] for e in results["results"])
+            suivant = results.get("suivant")
+            if not suivant:
+                break
+
+        self.assertEqual(ids, [i for i, _ in tous])
+
+    def renommer(self, elu, nom):
+        with connection.cursor() as cursor:
+            cursor.execute(
+                "UPDATE data_france_elumunicipal "
+                "SET nom = %s, prenom = %s, search = data_france_vecteur_recherche(%s) "
+                "WHERE id = %s",
+                [nom, nom, nom, elu.id],
+            )
+
+    def test_seuil_recherche_approchee_apres_filtres(self):
+        exact, proche = (
+            EluMunicipal.objects.exclude(commune__code="25222").first(),
+            EluMunicipal.objects.filter(commune__code="25222").first(),
+        )
+        self.renommer(exact, "Zyxwvut")
+        self.renommer(proche, "Zyxwvuz")
+
+        params = {"q": "zyxwvut", "commune": "25222", "approchee": "1"}
+        req = self.factory.get(
+            f"/elus-municipaux/chercher/?{self.query_builder(params)}"
+        )
+        # sans filtre, un seul résultat exact suffit à écarter la recherche approchée
+        with patch.object(SearchQueryset, "SEUIL_RECHERCHE_APPROCHEE", 1):
+            status, results = self.get_status_json(self.view(req))
+
+        self.assertEqual(status, 200)
+        self.assertEqual([e["id"] for e in results["results"]], [proche.id])
+
+    def test_recherche_par_nom_et_commune(self):
+        elu = EluMunicipal.objects.filter(commune__code="25222").first()
+
+        req = self.factory.get(
+            f"/elus-municipaux/chercher/?{self.query_builder({'q': f'{elu.nom} etalans'})}"
+        )
+        status, results = self.get_status_json(self.view(req))
+
+        self.assertEqual(status, 200)
+        self.assertIn(elu.as_dict(), results["results"])
+
+    def test_recherche_sans_requete(self):
+        req = self.factory.get("/elus-municipaux/chercher/")
+        status, results = self.get_status_json(self.view(req))
+
+        self.assertEqual(status, 400)
+        self.assertCountEqual(results["errors"], ["q"])
+
+
+class RechercheGlobaleViewTestCase(ViewTestCase):
+    view_class = RechercheGlobaleView
+
+    def chercher(self, params):
+        req = self.factory.get(f"/chercher/?{self.query_builder(params)}")
+        return self.get_status_json(self.view(req))
+
+    def test_surlignage(self):
+        status, results = self.chercher({"q": "doubs", "highlight": "1"})
+
+        self.assertEqual(status, 200)
+        self.assertEqual(
+            results["results"]["departements"][0]["highlight"],
+            {"nom": [[0, 5]], "code": []},
+        )
+        for elu in results["results"]["elus-municipaux"]:
+            self.assertCountEqual(elu["highlight"], ["nom", "prenom"])
+
+    def test_recherche_dans_tous_les_types(self):
+        d = Departement.objects.select_related("chef_lieu").get(code="25")
+        # la version des données est lue une première fois, puis gardée en mémoire
+        self.chercher({"q": "jura"})
+
+        with self.assertNumQueries(1):
+            status, results = self.chercher({"q": "doubs"})
+
+        self.assertEqual(status, 200)
+        self.assertCountEqual(
+            results["results"],
+            [
+                "communes",
+                "epci",
+                "departements",
+                "regions",
+                "codes-postaux",
+                "elus-municipaux",
+            ],
+        )
+        self.assertEqual(results["results"]["departements"][0], d.as_dict())
+        self.assertEqual(results["results"]["codes-postaux"], [])
+        for commune in results["results"]["communes"]:
+            self.assertIn("code", commune)
+
+    def test_recherche_par_code_postal(self):
+        status, results = self.chercher([("q", "25"), ("types", "codes-postaux")])
+
+        self.assertEqual(status, 200)
+        self.assertEqual(list(results["results"]), ["codes-postaux"])
+        codes = [cp["code"] for cp in results["results"]["codes-postaux"]]
+        self.assertTrue(codes)
+        self.assertEqual(codes, sorted(codes))
+        for code in codes:
+            self.assertTrue(code.startswith("25"))
+
+    def test_recherche_elus(self):
+        elu = EluMunicipal.objects.filter(commune__code="25222").first()
+
+        status, results = self.chercher(
+            [("q", f"{elu.nom} etalans"), ("types", "elus-municipaux"), ("limit", 20)]
+        )
+
+        self.assertEqual(status, 200)
+        self.assertIn(elu.as_dict(), results["results"]["elus-municipaux"])
+
+    def test_limite_par_type(self):
+        status, results = self.chercher({"q": "b", "limit": 2})
+
+        self.assertEqual(status, 200)
+        for resultats in results["results"].values():
+            self.assertLessEqual(len(resultats), 2)
+
+    def test_repli_sans_document(self):
+        avec_documents = self.chercher({"q": "doubs"})
+        DocumentPrecalcule.objects.filter(cle__startswith="entites/").delete()
+
+        self.assertEqual(self.chercher({"q": "doubs"}), avec_documents)
+
+    def test_parametres_invalides(self):
+        status, results = self.chercher({"types": "cantons"})
+
+        self.assertEqual(status, 400)
+        self.assertCountEqual(results["errors"], ["q", "types"])
+
+
+@skipIf(msgpack is None, "msgpack n'est pas installé")
+class MsgpackTestCase(ViewTestCase):
+    view_class = DepartementParCodeView
+
+    def test_reponse_msgpack(self):
+        d = Departement.objects.select_related("chef_lieu").get(code="25")
+
+        req = self.factory.get(
+            f"/departements/?{self.query_builder({'code': '25'})}",
+            HTTP_ACCEPT="application/msgpack",
+        )
+        res = self.view(req)
+
+        self.assertEqual(res.status_code, 200)
+        self.assertEqual(res["Content-Type"], "application/msgpack")
+        self.assertEqual(msgpack.unpackb(res.content), d.as_dict())
+
+    def test_erreurs_en_msgpack(self):
+        req = self.factory.get(
+            f"/localiser/?{self.query_builder({'lat': 'abc'})}",
+            HTTP_ACCEPT="application/msgpack",
+        )
+        res = LocaliserView.as_view()(req)
+
+        self.assertEqual(res.status_code, 400)
+        self.assertEqual(res["Content-Type"], "application/msgpack")
+        self.assertCountEqual(msgpack.unpackb(res.content)["errors"], ["lat", "lon"])
+
+    def test_negociation_selon_qualite(self):
+        for accept, attendu in [
+            ("application/msgpack", FORMAT_MSGPACK),
+            ("application/json, application/msgpack", FORMAT_MSGPACK),
+            ("application/msgpack;q=0", FORMAT_JSON),
+            ("application/json, application/msgpack;q=0.5", FORMAT_JSON),
+            ("application/msgpack;q=0.9, */*;q=0.1", FORMAT_MSGPACK),
+            ("application/x-msgpack-foo", FORMAT_JSON),
+            ("*/*", FORMAT_JSON),
+            ("", FORMAT_JSON),
+        ]:
+            with self.subTest(accept=accept):
+                req = self.factory.get("/", HTTP_ACCEPT=accept)
+                self.assertEqual(format_reponse(req), attendu)
+
+    def test_geometrie_en_wkb(self):
+        d = Departement.objects.get(code="25")
+
+        req = self.factory.get(
+            f"/departements/?{self.query_builder({'code': '25', 'geojson': '1', 'wkb': '1'})}",
+            HTTP_ACCEPT="application/msgpack",
+        )
+        res = self.view(req)
+
+        self.assertEqual(res.status_code, 200)
+        self.assertEqual(
+            msgpack.unpackb(res.content)["geometry"], bytes(d.geometry.wkb)
+        )